@@ -7,6 +7,26 @@ from app.config import Config
 # Initialize MongoDB
 mongo = PyMongo()
 
+def init_mongo(app):
+    """Create this process's MongoDB client"""
+    from app.utils.mongo_monitoring import build_client_options
+    mongo.init_app(app, **build_client_options(app.config))
+
+def reinit_after_fork(app):
+    """
+    Give a forked worker its own MongoDB client and per-process state.
+
+    MongoClient is not fork-safe, so a worker must not reuse the one created
+    in the gunicorn master by preload_app. Called from gunicorn's post_fork.
+    """
+    from app.utils.change_feed import employee_events
+    from app.utils.mongo_monitoring import pool_metrics
+
+    init_mongo(app)
+    pool_metrics.reset()
+    # Event ids must differ per worker so a reconnect to another worker resets instead of resuming wrongly
+    employee_events.reset()
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
@@ -17,19 +37,45 @@ def create_app(config_class=Config):
     ])
 
     # Initialize extensions
-    mongo.init_app(app)
+    init_mongo(app)
     
     # Register blueprints
     from app.routes.main import main_bp
     from app.routes.auth import auth_bp
     from app.routes.excel import excel_bp
+    from app.routes.upload_session import upload_session_bp
     from app.routes.employee import employee_bp
     from app.routes.employee_column_mapping import employee_column_mapping_bp
+    from app.routes.worker import worker_bp
+    from app.routes.internal import internal_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.health import health_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(excel_bp)
+    app.register_blueprint(upload_session_bp)
     app.register_blueprint(employee_bp)
     app.register_blueprint(employee_column_mapping_bp)
+    app.register_blueprint(worker_bp)
+    app.register_blueprint(internal_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(health_bp)
+
+    # Request latency and status metrics
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+
+    # Server-Timing headers for requests that record stage timings
+    from app.utils.timing import init_timing
+    init_timing(app)
+
+    # Opt-in cProfile wrapper around every view (no-op unless PROFILING_ENABLED)
+    from app.utils.profiling import init_profiling
+    init_profiling(app)
+
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     return app
\ No newline at end of file
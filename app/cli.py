@@ -0,0 +1,90 @@
+import json
+import subprocess
+import sys
+
+import click
+
+# Modules that should only be imported on the first ingest call
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl')
+
+
+def parse_importtime(stderr: str):
+    """Parse `python -X importtime` output into a list of per-module timings (microseconds)."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header row
+        records.append({
+            'module': parts[2].strip(),
+            'self_us': int(parts[0]),
+            'cumulative_us': int(parts[1])
+        })
+    return records
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI."""
+
+    @app.cli.command('import-report')
+    @click.option('--module', default='wsgi', show_default=True, help='Module to import, as a gunicorn worker would.')
+    @click.option('--top', default=25, show_default=True, help='Number of slowest imports to show.')
+    @click.option('--as-json', is_flag=True, help='Print the report as JSON.')
+    def import_report(module, top, as_json):
+        """Report import times for the app using `python -X importtime`."""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise click.ClickException(f'Importing {module} failed:\n{result.stderr[-2000:]}')
+
+        records = parse_importtime(result.stderr)
+        loaded = {record['module'] for record in records}
+        report = {
+            'module': module,
+            'total_ms': round(sum(r['self_us'] for r in records) / 1000, 1),
+            'heavy_modules_loaded': [name for name in HEAVY_MODULES if name in loaded],
+            'slowest': sorted(records, key=lambda r: r['cumulative_us'], reverse=True)[:top]
+        }
+
+        if as_json:
+            click.echo(json.dumps(report, indent=2))
+            return
+
+        click.echo(f"Importing {module}: {report['total_ms']} ms total")
+        if report['heavy_modules_loaded']:
+            click.echo(f"WARNING: heavy modules loaded at import: {', '.join(report['heavy_modules_loaded'])}")
+        click.echo(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for record in report['slowest']:
+            click.echo(f"{record['cumulative_us'] / 1000:>14.1f} {record['self_us'] / 1000:>9.1f}  {record['module']}")
+
+    @app.cli.command('dedupe-employees')
+    @click.option('--dry-run', is_flag=True, help='Only report what would change.')
+    @click.option('--batch-size', default=500, show_default=True, help='Duplicate groups merged per bulk write.')
+    def dedupe_employees(dry_run, batch_size):
+        """Merge employees stored under differently formatted EMAIL_ADDRESS / PHONE_NUMBER keys,
+        and rename ADDITIONAL_FIELDS keyed by sheet header (e.g. "Cost Centre") to engine names."""
+        from app.models.employee import Employee
+
+        stats = Employee.merge_duplicates(dry_run=dry_run, batch_size=batch_size)
+        prefix = 'Would merge' if dry_run else 'Merged'
+        click.echo(f"{prefix} {stats['duplicate_groups']} duplicate groups out of {stats['employees']} employees: "
+                   f"{stats['rewritten']} documents rewritten, {stats['removed']} removed")
+
+    @app.cli.command('migrate-column-mapping-versions')
+    def migrate_column_mapping_versions():
+        """Convert column mapping versions stored as strings to ints (run once before editing mappings)."""
+        from app.models.column_mapping import ColumnMapping
+
+        click.echo(f"Converted {ColumnMapping.migrate_string_versions()} column mapping versions to int")
+
+    @app.cli.command('backfill-column-mapping-labels')
+    def backfill_column_mapping_labels():
+        """Store the label fingerprint on older column mappings, so relabelled layouts are found on upload."""
+        from app.models.column_mapping import ColumnMapping
+
+        click.echo(f"Backfilled {ColumnMapping.backfill_label_fingerprints()} column mapping label fingerprints")
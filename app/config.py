@@ -3,9 +3,83 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _optional_int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'you-will-never-guess'
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/flask_mongo_app'
     RESOURCE_FOLDER = os.environ.get('RESOURCE_FOLDER', 'resources')
     ALLOWED_EXTENSIONS = {'xls', 'xlsx'}
+    # Record peak memory per upload stage with tracemalloc (slows ingest noticeably; traced uploads run one at a time per worker)
+    TRACEMALLOC_SPANS = os.environ.get('TRACEMALLOC_SPANS', 'false').lower() == 'true'
     MANDATORY_COLUMNS = {'name', 'phone_number', 'email_address', 'department', 'role', 'end_of_probation', 'is_part_time'}
+
+    # Seconds a worker process reuses the workforce leave calendar before reloading it
+    AVAILABILITY_CACHE_TTL_SECONDS = int(os.environ.get('AVAILABILITY_CACHE_TTL_SECONDS', 60))
+
+    # MongoDB connection pool (None leaves the pymongo default)
+    MONGO_MAX_POOL_SIZE = _optional_int('MONGO_MAX_POOL_SIZE', 100)
+    MONGO_MIN_POOL_SIZE = _optional_int('MONGO_MIN_POOL_SIZE', 0)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int('MONGO_WAIT_QUEUE_TIMEOUT_MS')
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = _optional_int('MONGO_SERVER_SELECTION_TIMEOUT_MS')
+    MONGO_CONNECT_TIMEOUT_MS = _optional_int('MONGO_CONNECT_TIMEOUT_MS')
+    MONGO_SOCKET_TIMEOUT_MS = _optional_int('MONGO_SOCKET_TIMEOUT_MS')
+    MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')  # e.g. "zstd,snappy,zlib"
+
+    # On-demand request profiling; send PROFILING_TOKEN in the X-Profile-Token header to profile one request
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/genesis-profiles')
+
+    # Shared secret for /internal endpoints and /metrics. Without it they return 404,
+    # unless INTERNAL_ENDPOINTS_PUBLIC=true opens them (local development only)
+    INTERNAL_API_TOKEN = os.environ.get('INTERNAL_API_TOKEN')
+    INTERNAL_ENDPOINTS_PUBLIC = os.environ.get('INTERNAL_ENDPOINTS_PUBLIC', 'false').lower() == 'true'
+
+    # Authentication
+    AUTH_REQUIRED = os.environ.get('AUTH_REQUIRED', 'false').lower() == 'true'
+    AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 10000))
+    AUTH_USER_CACHE_TTL_SECONDS = int(os.environ.get('AUTH_USER_CACHE_TTL_SECONDS', 60))
+    REFRESH_TOKEN_TTL_DAYS = int(os.environ.get('REFRESH_TOKEN_TTL_DAYS', 30))
+
+    # Resumable upload sessions; the spool directory must be shared by every worker
+    UPLOAD_SESSION_DIR = os.environ.get('UPLOAD_SESSION_DIR', '/tmp/genesis-uploads')
+    UPLOAD_SESSION_TTL_HOURS = int(os.environ.get('UPLOAD_SESSION_TTL_HOURS', 24))
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+    UPLOAD_MAX_CHUNK_BYTES = int(os.environ.get('UPLOAD_MAX_CHUNK_BYTES', 32 * 1024 * 1024))
+    UPLOAD_MAX_FILE_BYTES = int(os.environ.get('UPLOAD_MAX_FILE_BYTES', 1024 * 1024 * 1024))
+
+    # Rows read by /api/excel/upload?mode=preview (override per request with ?rows=)
+    UPLOAD_PREVIEW_ROWS = int(os.environ.get('UPLOAD_PREVIEW_ROWS', 20))
+    UPLOAD_PREVIEW_MAX_ROWS = int(os.environ.get('UPLOAD_PREVIEW_MAX_ROWS', 1000))
+
+    # Ingest admission control, shared by every worker through MongoDB (0 disables the limit)
+    INGEST_MAX_CONCURRENT = int(os.environ.get('INGEST_MAX_CONCURRENT', 2))
+    # Seconds an upload waits for a free ingest slot before getting 429 (0 rejects immediately)
+    INGEST_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('INGEST_QUEUE_TIMEOUT_SECONDS', 0))
+    INGEST_RETRY_AFTER_SECONDS = int(os.environ.get('INGEST_RETRY_AFTER_SECONDS', 30))
+    INGEST_LEASE_SECONDS = int(os.environ.get('INGEST_LEASE_SECONDS', 300))
+    # Upsert budget in ops/sec across all running ingests (0 leaves writes unpaced)
+    INGEST_WRITE_BUDGET_OPS = int(os.environ.get('INGEST_WRITE_BUDGET_OPS', 5000))
+    INGEST_UPSERT_BATCH_SIZE = int(os.environ.get('INGEST_UPSERT_BATCH_SIZE', 500))
+
+    # Employee change feed (server-sent events)
+    EVENT_BUS_BUFFER_SIZE = int(os.environ.get('EVENT_BUS_BUFFER_SIZE', 1000))
+    EVENT_STREAM_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_STREAM_HEARTBEAT_SECONDS', 15))
+    # Streams close after this long and clients reconnect with Last-Event-ID, so no worker is held indefinitely
+    EVENT_STREAM_MAX_SECONDS = float(os.environ.get('EVENT_STREAM_MAX_SECONDS', 25))
+    # Open streams allowed per worker process; each holds a worker thread, so keep this well below
+    # GUNICORN_THREADS or CRUD and upload requests starve. Further subscribers get a 503 with Retry-After.
+    EVENT_STREAM_MAX_CONCURRENT = int(os.environ.get('EVENT_STREAM_MAX_CONCURRENT', 1))
+    # Feed from a MongoDB change stream instead of the in-process bus (requires a replica set)
+    EMPLOYEE_CHANGE_STREAM = os.environ.get('EMPLOYEE_CHANGE_STREAM', 'false').lower() == 'true'
+
+    # Readiness probe (/readyz): how long a Mongo ping result is reused, and how long a ping may take
+    READINESS_CACHE_SECONDS = float(os.environ.get('READINESS_CACHE_SECONDS', 5))
+    READINESS_PING_TIMEOUT_SECONDS = float(os.environ.get('READINESS_PING_TIMEOUT_SECONDS', 2))
+
+    # Shared thread pool that routes use to run independent MongoDB queries concurrently
+    QUERY_FANOUT_WORKERS = int(os.environ.get('QUERY_FANOUT_WORKERS', 8))
+    QUERY_FANOUT_TIMEOUT_SECONDS = float(os.environ.get('QUERY_FANOUT_TIMEOUT_SECONDS', 10))
@@ -5,36 +5,50 @@ import json
 from app.config import Config  # Assuming Config is defined in app.config
 from app.models.dynamic_worker import DynamicExcelModel
 from app.models.error_response import ErrorResponse
+from app.utils.coercion import coerce_frame
+from app.utils.column_plan import ColumnPlan
+from app.utils.timing import span
 class ExcelModelFactory:
     """Factory class to create DynamicExcelModel instances from Excel data."""
     
     @staticmethod
-    def from_dataframe(df: Union[pd.DataFrame, Dict[str, pd.DataFrame]]) -> List[DynamicExcelModel]:
+    def from_dataframe(df: Union[pd.DataFrame, Dict[str, pd.DataFrame]], plan: Optional[ColumnPlan] = None,
+                       validate: bool = True) -> List[DynamicExcelModel]:
         """Create model instances from pandas DataFrame or dictionary of DataFrames."""
         if isinstance(df, pd.DataFrame):
-            excel_models = ExcelModelFactory._process_single_dataframe(df)
-            ExcelModelFactory.validate_columns(excel_models)
+            with span('process_dataframe'):
+                excel_models = ExcelModelFactory._process_single_dataframe(df, plan)
+            if validate:
+                with span('validate_columns'):
+                    ExcelModelFactory.validate_columns(excel_models)
             return excel_models
         elif isinstance(df, dict):
             models = []
             for sheet_name, sheet_df in df.items():
                 if not isinstance(sheet_df, pd.DataFrame):
                     raise TypeError(f"Expected a DataFrame for sheet '{sheet_name}', but got {type(sheet_df)}")
-                models.extend(ExcelModelFactory._process_single_dataframe(sheet_df))
+                with span(f'process_dataframe_{sheet_name}'):
+                    models.extend(ExcelModelFactory._process_single_dataframe(sheet_df, plan))
             return models
         else:
             raise TypeError(f"Expected a DataFrame or dictionary of DataFrames, but got {type(df)}")
 
     @staticmethod
-    def _process_single_dataframe(df: pd.DataFrame) -> List[DynamicExcelModel]:
+    def _process_single_dataframe(df: pd.DataFrame, plan: Optional[ColumnPlan] = None) -> List[DynamicExcelModel]:
         """Helper method to process a single DataFrame."""
+        # Rename and route the columns once per sheet instead of checking every cell
+        df, mandatory = (plan or ColumnPlan()).apply(df)
+        # Key and typed columns are cast in bulk so upserts match what the API stores
+        with span('coerce_columns'):
+            df = coerce_frame(df)
+        columns = list(zip(df.columns, mandatory))
         models = []
-        for _, row in df.iterrows():
+        for row in df.itertuples(index=False, name=None):
             model = DynamicExcelModel()
             additional_fields = {}
-            for column, value in row.items():
+            for (column, is_mandatory), value in zip(columns, row):
                 if value is not None and not pd.isna(value):
-                    if column.lower() in Config.MANDATORY_COLUMNS:
+                    if is_mandatory:
                         model.set_attribute(column, value)
                     else:
                         additional_fields[column] = value
@@ -44,10 +58,16 @@ class ExcelModelFactory:
         return models
     
     @staticmethod
-    def from_excel_file(file_path: str) -> List[DynamicExcelModel]:
+    def read_excel(file_path: str, **kwargs) -> pd.DataFrame:
+        """Read the first sheet of an Excel file into a DataFrame."""
+        with span('read_excel'):
+            return pd.read_excel(file_path, engine="openpyxl", **kwargs)
+    
+    @staticmethod
+    def from_excel_file(file_path: str, plan: Optional[ColumnPlan] = None) -> List[DynamicExcelModel]:
         """Create model instances directly from Excel file."""
-        df = pd.read_excel(file_path, engine="openpyxl")  # Read all sheets
-        return ExcelModelFactory.from_dataframe(df)
+        df = ExcelModelFactory.read_excel(file_path)
+        return ExcelModelFactory.from_dataframe(df, plan)
     
     @staticmethod
     def from_dict_list(data: List[Dict[str, Any]]) -> List[DynamicExcelModel]:
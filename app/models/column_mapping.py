@@ -0,0 +1,174 @@
+import hashlib
+import uuid
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app import mongo
+from app.utils.index_utils import ensure_indexes
+
+COLUMN_MAPPING_INDEXES = [
+    ([('uuid', ASCENDING)], {'unique': True}),
+    # Legacy mappings have no fingerprint, so uniqueness only applies where it is set
+    ([('fingerprint', ASCENDING)], {'unique': True, 'partialFilterExpression': {'fingerprint': {'$exists': True}}}),
+    # Finds a relabelled mapping from an upload's headers; set on every mapping since it was added
+    ([('label_fingerprint', ASCENDING), ('last_seen_at', DESCENDING), ('created_at', DESCENDING)],
+     {'partialFilterExpression': {'label_fingerprint': {'$exists': True}}}),
+    ([('last_seen_at', DESCENDING), ('created_at', DESCENDING)], {}),
+    ([('created_at', DESCENDING)], {}),
+]
+
+# Most recently used first; legacy mappings without last_seen_at fall back to created_at
+LATEST_SORT = [('last_seen_at', DESCENDING), ('created_at', DESCENDING)]
+
+
+class ColumnMapping:
+    """Registry of employee column mappings, deduplicated by a fingerprint of the header set."""
+
+    @staticmethod
+    def _collection():
+        collection = mongo.db.employee_column_mapping
+        ensure_indexes(collection, COLUMN_MAPPING_INDEXES)
+        return collection
+
+    @staticmethod
+    def _read_collection():
+        # Lookups never create the collection or its indexes, so read-only paths (upload preview) stay read-only
+        return mongo.db.employee_column_mapping
+
+    @staticmethod
+    def fingerprint(engine_names):
+        """Stable hash of the normalized (engine_name) header set, independent of column order"""
+        normalized = '\n'.join(sorted({name.strip().upper() for name in engine_names}))
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def label_fingerprint(labels):
+        """Stable hash of the normalized (trimmed, lowercased) label set; blank labels are ignored"""
+        normalized = '\n'.join(sorted({str(label).strip().lower() for label in labels} - {''}))
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _labels(mapping):
+        for key in ('required_columns', 'non_required_columns'):
+            for column in (mapping.get(key) or {}).values():
+                yield column.get('label') or ''
+
+    @staticmethod
+    def register(required_columns, non_required_columns):
+        """
+        Return the mapping for this header set, creating it on first sight.
+
+        Identical header sets reuse one document: only `last_seen_at` and
+        `upload_count` change, so the collection grows with distinct layouts,
+        not with uploads.
+        """
+        fingerprint = ColumnMapping.fingerprint(list(required_columns) + list(non_required_columns))
+        now = datetime.now(timezone.utc)
+        query = {'fingerprint': fingerprint}
+        update = {
+            '$setOnInsert': {
+                'required_columns': required_columns,
+                'non_required_columns': non_required_columns,
+                'created_at': now,
+                'uuid': str(uuid.uuid4()),
+                'version': 1,
+                'label_fingerprint': ColumnMapping.label_fingerprint(
+                    ColumnMapping._labels({'required_columns': required_columns,
+                                           'non_required_columns': non_required_columns}))
+            },
+            '$set': {'last_seen_at': now},
+            '$inc': {'upload_count': 1}
+        }
+        collection = ColumnMapping._collection()
+        try:
+            return collection.find_one_and_update(query, update, upsert=True, return_document=ReturnDocument.AFTER)
+        except DuplicateKeyError:
+            # A concurrent upload inserted the same fingerprint first; update theirs
+            return collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+
+    @staticmethod
+    def get_by_fingerprint(fingerprint):
+        return ColumnMapping._read_collection().find_one({'fingerprint': fingerprint})
+
+    @staticmethod
+    def get_by_label_fingerprint(label_fingerprint):
+        """Most recently used mapping whose current labels hash to `label_fingerprint`"""
+        return ColumnMapping._read_collection().find_one({'label_fingerprint': label_fingerprint}, sort=LATEST_SORT)
+
+    @staticmethod
+    def get_by_uuid(mapping_uuid):
+        return ColumnMapping._read_collection().find_one({'uuid': mapping_uuid})
+
+    @staticmethod
+    def update_columns(mapping_uuid, fields, expected_version):
+        """
+        Set column fields and bump the version, only if the stored version still matches.
+
+        The edited labels are hashed into `label_fingerprint` in the same write.
+        The version read is the one the write is conditioned on, so a concurrent
+        edit makes the write miss rather than store a stale fingerprint.
+
+        Args:
+            mapping_uuid: Mapping to update
+            fields: Dotted paths to set, e.g. {'required_columns.NAME.label': 'Full name'}
+            expected_version: Version the client edited
+
+        Returns:
+            The updated mapping, or None if it does not exist or the version no longer matches
+        """
+        collection = ColumnMapping._collection()
+        query = {'uuid': mapping_uuid, 'version': expected_version}
+        current = collection.find_one(query)
+        if not current:
+            return None
+
+        edited = {key: dict(current.get(key) or {}) for key in ('required_columns', 'non_required_columns')}
+        for path, value in fields.items():
+            key, engine_name, field = path.split('.')
+            edited[key][engine_name] = dict(edited[key].get(engine_name) or {}, **{field: value})
+
+        return collection.find_one_and_update(
+            query,
+            {
+                '$set': dict(fields,
+                             label_fingerprint=ColumnMapping.label_fingerprint(ColumnMapping._labels(edited)),
+                             updated_at=datetime.now(timezone.utc)),
+                '$inc': {'version': 1}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def migrate_string_versions():
+        """Convert versions older mappings stored as strings to ints, which $inc needs; returns the count"""
+        result = ColumnMapping._collection().update_many(
+            {'version': {'$type': 'string'}},
+            [{'$set': {'version': {'$toInt': '$version'}}}]
+        )
+        return result.modified_count
+
+    @staticmethod
+    def backfill_label_fingerprints():
+        """Set `label_fingerprint` on mappings stored before it existed; returns the count"""
+        collection = ColumnMapping._collection()
+        updated = 0
+        for mapping in collection.find({'label_fingerprint': {'$exists': False}}):
+            collection.update_one(
+                {'_id': mapping['_id'], 'label_fingerprint': {'$exists': False}},
+                {'$set': {'label_fingerprint': ColumnMapping.label_fingerprint(ColumnMapping._labels(mapping))}}
+            )
+            updated += 1
+        return updated
+
+    @staticmethod
+    def latest():
+        return ColumnMapping._read_collection().find_one({}, sort=LATEST_SORT)
+
+    @staticmethod
+    def history(page=1, limit=20):
+        """Get one page of mappings, newest first, with the collection size"""
+        collection = ColumnMapping._collection()
+        mappings = list(collection.find().sort('created_at', DESCENDING).skip((page - 1) * limit).limit(limit))
+        return mappings, collection.estimated_document_count()
@@ -0,0 +1,201 @@
+import logging
+import uuid
+
+from pymongo import ASCENDING, DeleteMany, ReplaceOne
+
+from app import mongo
+from app.utils.coercion import coerce_record, employee_key
+from app.utils.column_plan import engine_name_for
+from app.utils.index_utils import ensure_indexes, reset_ensured_indexes
+from app.utils.timing import span
+
+logger = logging.getLogger(__name__)
+
+EMPLOYEE_COLLECTION = 'employee'
+
+EMPLOYEE_INDEXES = [
+    # Ingest matches existing employees on both fields
+    ([('EMAIL_ADDRESS', ASCENDING), ('PHONE_NUMBER', ASCENDING)], {}),
+    # Spreadsheet columns outside MANDATORY_COLUMNS differ per upload, so one wildcard index covers them all
+    ([('ADDITIONAL_FIELDS.$**', ASCENDING)], {}),
+]
+
+
+def _has_canonical_key(document):
+    # 5.0 == 5, so compare types as well
+    stored = (document.get('EMAIL_ADDRESS'), document.get('PHONE_NUMBER'))
+    return all(a == b and type(a) is type(b) for a, b in zip(employee_key(document), stored))
+
+
+def _canonical_additional_fields(fields):
+    # Uploads before column plans keyed ADDITIONAL_FIELDS by sheet header ("Cost Centre"), now by engine name;
+    # where a document has both, the engine-name value is the newer one
+    renamed = {engine_name_for(key): value for key, value in fields.items() if engine_name_for(key) != key}
+    renamed.update((key, value) for key, value in fields.items() if engine_name_for(key) == key)
+    return renamed
+
+
+def _has_legacy_additional_fields(document):
+    return any(engine_name_for(key) != key for key in document.get('ADDITIONAL_FIELDS') or {})
+
+
+def _copy_indexes(source, target):
+    # Indexes added outside EMPLOYEE_INDEXES (e.g. by hand) would otherwise vanish with the dropped collection
+    existing = {tuple(index['key'].items()) for index in target.list_indexes()}
+    for index in source.list_indexes():
+        keys = list(index['key'].items())
+        if tuple(keys) in existing:
+            continue
+        options = {name: value for name, value in index.items() if name not in ('v', 'key', 'ns')}
+        target.create_index(keys, **options)
+
+
+class Employee:
+    """Collection-level operations on employees; the routes work with plain documents."""
+
+    @staticmethod
+    def collection():
+        collection = mongo.db[EMPLOYEE_COLLECTION]
+        ensure_indexes(collection, EMPLOYEE_INDEXES)
+        return collection
+
+    @staticmethod
+    def replace_all(documents, batch_size=1000, on_batch=None):
+        """
+        Replace the whole employee collection with `documents`, all or nothing.
+
+        Documents are bulk-inserted into a fresh staging collection, indexes
+        are built once the data is loaded, the count is checked, and the
+        staging collection is renamed over `employee` in one atomic step.
+        Readers see either the old or the new collection, never a mix. Employees
+        that already exist (same EMAIL_ADDRESS and PHONE_NUMBER) keep their _id.
+
+        Writes to `employee` made while this runs are lost at the swap. Callers
+        must stop them first: the upload route holds every ingest slot
+        (exclusive_ingest) and the employee write routes return 503 meanwhile.
+        Indexes on the live collection are recreated on the staging one.
+
+        Args:
+            documents: Complete set of employee documents
+            batch_size: Documents per insert_many call
+            on_batch: Optional callable given the size of each inserted batch (for pacing)
+
+        Returns:
+            Number of employees in the new collection
+        """
+        if not documents:
+            raise ValueError('Refusing to replace employees with an empty snapshot')
+
+        live = mongo.db[EMPLOYEE_COLLECTION]
+        with span('match_existing_ids'):
+            existing_ids = {
+                (doc.get('EMAIL_ADDRESS'), doc.get('PHONE_NUMBER')): doc['_id']
+                for doc in live.find({}, {'EMAIL_ADDRESS': 1, 'PHONE_NUMBER': 1})
+            }
+        for document in documents:
+            existing_id = existing_ids.get((document.get('EMAIL_ADDRESS'), document.get('PHONE_NUMBER')))
+            if existing_id is not None:
+                document['_id'] = existing_id
+
+        staging = mongo.db[f"{EMPLOYEE_COLLECTION}_staging_{uuid.uuid4().hex[:12]}"]
+        try:
+            with span('staging_load'):
+                for start in range(0, len(documents), batch_size):
+                    batch = documents[start:start + batch_size]
+                    staging.insert_many(batch, ordered=False)
+                    if on_batch:
+                        on_batch(len(batch))
+
+            # Building indexes once over the loaded data is far cheaper than maintaining them per insert
+            with span('staging_indexes'):
+                for keys, options in EMPLOYEE_INDEXES:
+                    staging.create_index(keys, **options)
+                _copy_indexes(live, staging)
+
+            count = staging.count_documents({})
+            if count != len(documents):
+                raise ValueError(f"Staging collection has {count} employees, expected {len(documents)}")
+
+            with span('swap'):
+                staging.rename(EMPLOYEE_COLLECTION, dropTarget=True)
+        except Exception:
+            staging.drop()
+            raise
+
+        # The swapped-in collection carries its own indexes
+        reset_ensured_indexes(EMPLOYEE_COLLECTION)
+        logger.info(f"Replaced employee collection with {count} employees")
+        return count
+
+    @staticmethod
+    def merge_duplicates(dry_run=False, batch_size=500):
+        """
+        Merge employees that share a canonical EMAIL_ADDRESS and PHONE_NUMBER,
+        and rewrite the ones stored in a non-canonical form (see app.utils.coercion)
+        or with ADDITIONAL_FIELDS keyed by sheet header instead of engine name.
+
+        Each group keeps its oldest _id. Fields are merged in _id order so the
+        most recently inserted document wins, as it would on an upsert;
+        ADDITIONAL_FIELDS are merged key by key.
+
+        Returns:
+            Dictionary with the number of duplicate groups, rewritten and removed documents
+        """
+        collection = Employee.collection()
+        groups = {}
+        legacy_ids = set()
+        with span('group_employees'):
+            projection = {'EMAIL_ADDRESS': 1, 'PHONE_NUMBER': 1, 'ADDITIONAL_FIELDS': 1}
+            for doc in collection.find({}, projection).sort('_id', ASCENDING):
+                if _has_legacy_additional_fields(doc):
+                    legacy_ids.add(doc['_id'])
+                doc.pop('ADDITIONAL_FIELDS', None)
+                groups.setdefault(employee_key(doc), []).append(doc)
+
+        pending = []
+        for key, docs in groups.items():
+            if not key[0]:
+                # No email to match on: never merge, only rename legacy ADDITIONAL_FIELDS keys
+                pending.extend([doc] for doc in docs if doc['_id'] in legacy_ids)
+            elif len(docs) > 1 or not _has_canonical_key(docs[0]) or docs[0]['_id'] in legacy_ids:
+                pending.append(docs)
+        stats = {
+            'employees': sum(len(docs) for docs in groups.values()),
+            'duplicate_groups': sum(1 for docs in pending if len(docs) > 1),
+            'rewritten': len(pending),
+            'removed': sum(len(docs) - 1 for docs in pending),
+        }
+        if dry_run or not pending:
+            return stats
+
+        with span('merge_duplicates'):
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                ids = [doc['_id'] for docs in batch for doc in docs]
+                full_docs = {doc['_id']: doc for doc in collection.find({'_id': {'$in': ids}})}
+                operations = []
+                for docs in batch:
+                    survivor_id = docs[0]['_id']
+                    merged, additional = {}, {}
+                    for doc in docs:
+                        doc = full_docs.get(doc['_id'])
+                        if doc is None:
+                            continue
+                        additional.update(_canonical_additional_fields(doc.get('ADDITIONAL_FIELDS') or {}))
+                        merged.update(doc)
+                    if not merged:
+                        continue
+                    if additional:
+                        merged['ADDITIONAL_FIELDS'] = additional
+                    if 'created_at' in full_docs.get(survivor_id, {}):
+                        merged['created_at'] = full_docs[survivor_id]['created_at']
+                    merged['_id'] = survivor_id
+                    operations.append(ReplaceOne({'_id': survivor_id}, coerce_record(merged)))
+                    others = [doc['_id'] for doc in docs[1:]]
+                    if others:
+                        operations.append(DeleteMany({'_id': {'$in': others}}))
+                if operations:
+                    collection.bulk_write(operations, ordered=True)
+
+        logger.info(f"Merged {stats['duplicate_groups']} duplicate employee groups, removed {stats['removed']} documents")
+        return stats
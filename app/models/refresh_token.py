@@ -0,0 +1,88 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING
+
+from app import mongo
+from app.config import Config
+from app.utils.index_utils import ensure_indexes
+
+REFRESH_TOKEN_INDEXES = [
+    ([('token_hash', ASCENDING)], {'unique': True}),
+    ([('family', ASCENDING)], {}),
+    # Mongo removes documents once `expires_at` has passed
+    ([('expires_at', ASCENDING)], {'expireAfterSeconds': 0}),
+]
+
+
+class RefreshToken:
+    """Long-lived, single-use refresh tokens. Only a SHA-256 digest of each token is stored."""
+
+    @staticmethod
+    def _collection():
+        collection = mongo.db.refresh_tokens
+        ensure_indexes(collection, REFRESH_TOKEN_INDEXES)
+        return collection
+
+    @staticmethod
+    def _hash(raw_token):
+        return hashlib.sha256(raw_token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def issue(user_id, family=None):
+        """Create a refresh token for a user and return the raw token"""
+        raw_token = secrets.token_urlsafe(32)
+        now = datetime.now(timezone.utc)
+        RefreshToken._collection().insert_one({
+            'token_hash': RefreshToken._hash(raw_token),
+            'user_id': str(user_id),
+            'family': family or secrets.token_hex(8),
+            'created_at': now,
+            'expires_at': now + timedelta(days=Config.REFRESH_TOKEN_TTL_DAYS)
+        })
+        return raw_token
+
+    @staticmethod
+    def rotate(raw_token):
+        """
+        Consume a refresh token and issue its replacement in the same family.
+
+        Used tokens are kept, marked with `used_at`, until they expire. Presenting
+        one again means it was copied: every token in its family is revoked, so
+        neither the thief nor the legitimate client can keep refreshing.
+
+        Returns a (user_id, new_raw_token) tuple, or None if the token is
+        unknown, already used or expired.
+        """
+        token_hash = RefreshToken._hash(raw_token)
+        now = datetime.now(timezone.utc)
+        existing = RefreshToken._collection().find_one_and_update(
+            {'token_hash': token_hash, 'expires_at': {'$gt': now}, 'used_at': {'$exists': False}},
+            {'$set': {'used_at': now}}
+        )
+        if not existing:
+            replayed = RefreshToken._collection().find_one({'token_hash': token_hash, 'used_at': {'$exists': True}})
+            if replayed:
+                RefreshToken._revoke_family(replayed)
+            return None
+        new_token = RefreshToken.issue(existing['user_id'], family=existing.get('family'))
+        return existing['user_id'], new_token
+
+    @staticmethod
+    def _revoke_family(document):
+        if document.get('family'):
+            RefreshToken._collection().delete_many({'family': document['family']})
+        else:
+            RefreshToken._collection().delete_one({'_id': document['_id']})
+
+    @staticmethod
+    def revoke(raw_token):
+        """Log out the session the token belongs to, including tokens rotated from it"""
+        existing = RefreshToken._collection().find_one({'token_hash': RefreshToken._hash(raw_token)})
+        if existing:
+            RefreshToken._revoke_family(existing)
+
+    @staticmethod
+    def revoke_all_for_user(user_id):
+        RefreshToken._collection().delete_many({'user_id': str(user_id)})
@@ -0,0 +1,134 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, ReturnDocument
+
+from app import mongo
+from app.config import Config
+from app.utils.index_utils import ensure_indexes
+
+UPLOAD_SESSION_INDEXES = [
+    ([('session_id', ASCENDING)], {'unique': True}),
+    # Mongo removes abandoned sessions once `expires_at` has passed
+    ([('expires_at', ASCENDING)], {'expireAfterSeconds': 0}),
+]
+
+# How long one chunk write may hold a session before another request can take over
+CHUNK_LOCK_SECONDS = 300
+
+OPEN = 'open'
+FINALIZING = 'finalizing'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class UploadSession:
+    """
+    Resumable upload sessions. The document tracks the committed byte offset;
+    the bytes themselves are spooled to a file in UPLOAD_SESSION_DIR.
+    """
+
+    @staticmethod
+    def _collection():
+        collection = mongo.db.upload_sessions
+        ensure_indexes(collection, UPLOAD_SESSION_INDEXES)
+        return collection
+
+    @staticmethod
+    def _expires_at(now):
+        return now + timedelta(hours=Config.UPLOAD_SESSION_TTL_HOURS)
+
+    @staticmethod
+    def spool_path(session_id):
+        return os.path.join(Config.UPLOAD_SESSION_DIR, f"{session_id}.part")
+
+    @staticmethod
+    def create(filename, size, sha256=None, user_id=None, mode='upsert'):
+        now = datetime.now(timezone.utc)
+        session = {
+            'session_id': uuid.uuid4().hex,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256,
+            'offset': 0,
+            'status': OPEN,
+            'user_id': user_id,
+            'mode': mode,
+            'created_at': now,
+            'updated_at': now,
+            'expires_at': UploadSession._expires_at(now)
+        }
+        UploadSession._collection().insert_one(session)
+        return session
+
+    @staticmethod
+    def get(session_id):
+        return UploadSession._collection().find_one({'session_id': session_id})
+
+    @staticmethod
+    def claim_chunk(session_id, offset):
+        """
+        Lock an open session for a chunk write at `offset`.
+
+        Returns the session, or None if it is missing, not open, at a
+        different offset or already being written to.
+        """
+        now = datetime.now(timezone.utc)
+        return UploadSession._collection().find_one_and_update(
+            {
+                'session_id': session_id,
+                'status': OPEN,
+                'offset': offset,
+                '$or': [{'locked_until': None}, {'locked_until': {'$lt': now}}]
+            },
+            {'$set': {'locked_until': now + timedelta(seconds=CHUNK_LOCK_SECONDS)}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def commit_chunk(session_id, offset, length):
+        """Advance the committed offset past a written chunk and release the lock"""
+        now = datetime.now(timezone.utc)
+        return UploadSession._collection().find_one_and_update(
+            {'session_id': session_id, 'offset': offset},
+            {
+                '$set': {'offset': offset + length, 'updated_at': now, 'expires_at': UploadSession._expires_at(now)},
+                '$unset': {'locked_until': ''}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def release(session_id):
+        UploadSession._collection().update_one({'session_id': session_id}, {'$unset': {'locked_until': ''}})
+
+    @staticmethod
+    def claim_finalize(session_id, size):
+        """Move a fully uploaded, unlocked session to `finalizing`; None if it is not ready"""
+        now = datetime.now(timezone.utc)
+        return UploadSession._collection().find_one_and_update(
+            {
+                'session_id': session_id,
+                'status': OPEN,
+                'offset': size,
+                '$or': [{'locked_until': None}, {'locked_until': {'$lt': now}}]
+            },
+            {'$set': {'status': FINALIZING, 'updated_at': now}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    def reopen(session_id):
+        """Return a finalizing session to `open` so finalize can be retried"""
+        UploadSession._collection().update_one(
+            {'session_id': session_id, 'status': FINALIZING},
+            {'$set': {'status': OPEN, 'updated_at': datetime.now(timezone.utc)}}
+        )
+
+    @staticmethod
+    def finish(session_id, status, error=None):
+        UploadSession._collection().update_one(
+            {'session_id': session_id},
+            {'$set': {'status': status, 'error': error, 'updated_at': datetime.now(timezone.utc)}}
+        )
@@ -1,16 +1,106 @@
+import re
 from app import mongo
+from app.config import Config
+from app.models.refresh_token import RefreshToken
+from app.utils.cache_utils import TTLCache
+from app.utils.index_utils import ensure_indexes
 from bson.objectid import ObjectId
+from pymongo import ASCENDING
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Short-lived cache of user documents for authenticated requests
+_user_cache = TTLCache(ttl_seconds=Config.AUTH_USER_CACHE_TTL_SECONDS, max_size=Config.AUTH_TOKEN_CACHE_SIZE)
+
+# Fields returned by listing endpoints; never expose password hashes
+PUBLIC_PROJECTION = {'password': 0}
+
+USER_INDEXES = [
+    # Serves email lookups, and email-prefix pages in (email, _id) order without an in-memory sort
+    ([('email', ASCENDING), ('_id', ASCENDING)], {}),
+]
+
 class User:
     @staticmethod
     def get_all():
         return list(mongo.db.users.find())
     
+    @staticmethod
+    def iter_all(projection=PUBLIC_PROJECTION, batch_size=500):
+        """Stream every user document without loading the collection into memory"""
+        cursor = mongo.db.users.find({}, projection).sort('_id', ASCENDING).batch_size(batch_size)
+        for user in cursor:
+            yield user
+    
+    @staticmethod
+    def list_page(limit=50, after=None, email_prefix=None, projection=PUBLIC_PROJECTION):
+        """
+        Get one page of users ordered by _id, or by (email, _id) when filtering
+        by email prefix so the (email, _id) index serves both the scan and the order.
+        
+        Args:
+            limit: Maximum number of users to return
+            after: Cursor returned with the previous page
+            email_prefix: Only return users whose email starts with this prefix
+            projection: Fields to include/exclude
+            
+        Returns:
+            Tuple of (users, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: If `after` is not a valid cursor
+        """
+        collection = mongo.db.users
+        ensure_indexes(collection, USER_INDEXES)
+        
+        filter_query = {}
+        if email_prefix:
+            # Anchored, case-sensitive prefix regexes can be answered from the email index
+            filter_query['email'] = {'$regex': f'^{re.escape(email_prefix)}'}
+            sort = [('email', ASCENDING), ('_id', ASCENDING)]
+            if after:
+                # Cursor is "<last _id>:<last email>"; ObjectIds never contain ':'
+                last_id, _, last_email = after.partition(':')
+                if not ObjectId.is_valid(last_id):
+                    raise ValueError('Invalid cursor')
+                filter_query['email']['$gte'] = last_email
+                filter_query['$or'] = [
+                    {'email': {'$gt': last_email}},
+                    {'email': last_email, '_id': {'$gt': ObjectId(last_id)}}
+                ]
+        else:
+            sort = [('_id', ASCENDING)]
+            if after:
+                if not ObjectId.is_valid(after):
+                    raise ValueError('Invalid cursor')
+                filter_query['_id'] = {'$gt': ObjectId(after)}
+        
+        # Fetch one extra document to know whether another page exists
+        users = list(collection.find(filter_query, projection).sort(sort).limit(limit + 1))
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            last = users[-1]
+            next_cursor = f"{last['_id']}:{last.get('email', '')}" if email_prefix else str(last['_id'])
+        return users, next_cursor
+    
     @staticmethod
     def get_by_id(user_id):
         return mongo.db.users.find_one({'_id': ObjectId(user_id)})
     
+    @staticmethod
+    def get_cached(user_id):
+        """Get a user by id, served from the short-TTL user cache when possible"""
+        user = _user_cache.get(str(user_id))
+        if user is None:
+            user = User.get_by_id(user_id)
+            if user:
+                _user_cache.set(str(user_id), user)
+        return user
+    
+    @staticmethod
+    def invalidate_cache(user_id):
+        _user_cache.invalidate(str(user_id))
+    
     @staticmethod
     def create(user_data):
         # Hash the password before storing it
@@ -23,12 +113,17 @@ class User:
     def update(user_id, user_data):
         if 'password' in user_data:
             user_data['password'] = generate_password_hash(user_data['password'])
+            # A password change signs the user out of every other session
+            RefreshToken.revoke_all_for_user(user_id)
         mongo.db.users.update_one({'_id': ObjectId(user_id)}, {'$set': user_data})
+        User.invalidate_cache(user_id)
         return User.get_by_id(user_id)
     
     @staticmethod
     def delete(user_id):
         mongo.db.users.delete_one({'_id': ObjectId(user_id)})
+        RefreshToken.revoke_all_for_user(user_id)
+        User.invalidate_cache(user_id)
 
     @staticmethod
     def find_by_email(email):
@@ -1,5 +1,25 @@
+from bisect import bisect_right
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Set, Tuple
+
+DATE_FORMAT = "%d/%m/%Y"
+
+@lru_cache(maxsize=8192)
+def parse_date(value: str) -> int:
+    """Parse a dd/mm/YYYY date into its proleptic Gregorian ordinal"""
+    return datetime.strptime(value, DATE_FORMAT).toordinal()
+
+def merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping or adjacent (start, end) ordinal intervals into a sorted, disjoint list"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
 
 class Worker:
     """Worker model class - represents a single worker entity"""
@@ -9,6 +29,26 @@ class Worker:
         self.skillset = skillset
         self.probation = probation
         self.leave_request = leave_request or []
+        self._index_leave()
+    
+    def _index_leave(self) -> None:
+        """Parse leave dates once into sorted, disjoint ordinal intervals for bisect lookups"""
+        intervals = merge_intervals([
+            (parse_date(leave["start"]), parse_date(leave["end"]))
+            for leave in self.leave_request
+        ])
+        self._leave_starts = [start for start, _ in intervals]
+        self._leave_ends = [end for _, end in intervals]
+    
+    @property
+    def skills(self) -> Set[str]:
+        """Normalized skills from the comma-separated skillset"""
+        return {skill.strip().lower() for skill in (self.skillset or '').split(',') if skill.strip()}
+    
+    @property
+    def leave_intervals(self) -> List[Tuple[int, int]]:
+        """Leave as merged (start, end) ordinal pairs, inclusive"""
+        return list(zip(self._leave_starts, self._leave_ends))
     
     def to_dict(self) -> Dict:
         """Convert worker object to dictionary"""
@@ -32,18 +72,22 @@ class Worker:
     def add_leave_request(self, start_date: str, end_date: str) -> None:
         """Add a leave request to this worker"""
         self.leave_request.append({"start": start_date, "end": end_date})
+        self._index_leave()
     
     def is_on_leave(self, check_date: str) -> bool:
         """Check if this worker is on leave on a specific date"""
-        check_dt = datetime.strptime(check_date, "%d/%m/%Y")
-        
-        for leave in self.leave_request:
-            start_dt = datetime.strptime(leave["start"], "%d/%m/%Y")
-            end_dt = datetime.strptime(leave["end"], "%d/%m/%Y")
-            
-            if start_dt <= check_dt <= end_dt:
-                return True
-        return False
+        return self.is_on_leave_ordinal(parse_date(check_date))
+    
+    def is_on_leave_ordinal(self, day: int) -> bool:
+        """Check leave for a date given as an ordinal, in O(log n)"""
+        i = bisect_right(self._leave_starts, day) - 1
+        return i >= 0 and self._leave_ends[i] >= day
+    
+    def has_leave_between(self, start_date: str, end_date: str) -> bool:
+        """Check if any leave overlaps the inclusive date range"""
+        start, end = parse_date(start_date), parse_date(end_date)
+        i = bisect_right(self._leave_starts, end) - 1
+        return i >= 0 and self._leave_ends[i] >= start
     
     def update_skillset(self, skillset: str) -> None:
         """Update worker's skillset"""
@@ -51,4 +95,4 @@ class Worker:
     
     def set_probation_status(self, status: bool) -> None:
         """Set probation status"""
-        self.probation = status
+        self.probation = status
\ No newline at end of file
@@ -1,9 +1,9 @@
-import jwt
-import datetime
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, g
 from werkzeug.security import check_password_hash
 from app.models.user import User
+from app.models.refresh_token import RefreshToken
 from app.config import Config
+from app.utils.auth_utils import create_access_token, token_required
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -26,13 +26,37 @@ def login():
         return jsonify({'error': 'Invalid email or password'}), 401
 
     # Generate JWT token
-    token = jwt.encode(
-        {
-            'user_id': str(user['_id']),
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
-        },
-        Config.SECRET_KEY,
-        algorithm='HS256'
-    )
-
-    return jsonify({'token': token}), 200
\ No newline at end of file
+    token = create_access_token(user['_id'])
+    refresh_token = RefreshToken.issue(user['_id'])
+
+    return jsonify({'token': token, 'refresh_token': refresh_token}), 200
+
+@auth_bp.route('/refresh', methods=['POST'])
+def refresh():
+    # Exchange a refresh token for a new access token without re-checking the password
+    data = request.get_json(silent=True)
+    if not data or not data.get('refresh_token'):
+        return jsonify({'error': 'Invalid or missing JSON payload'}), 400
+
+    rotated = RefreshToken.rotate(data['refresh_token'])
+    if not rotated:
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+
+    user_id, refresh_token = rotated
+    token = create_access_token(user_id)
+
+    return jsonify({'token': token, 'refresh_token': refresh_token}), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+def logout():
+    data = request.get_json(silent=True)
+    if not data or not data.get('refresh_token'):
+        return jsonify({'error': 'Invalid or missing JSON payload'}), 400
+
+    RefreshToken.revoke(data['refresh_token'])
+    return jsonify({'message': 'Logged out successfully'}), 200
+
+@auth_bp.route('/me', methods=['GET'])
+@token_required
+def me():
+    return jsonify(g.current_user), 200
\ No newline at end of file
@@ -1,48 +1,46 @@
 from flask import Blueprint, send_file, current_app, request, jsonify
 from app.models.error_response import ErrorResponse
 from app import mongo
-from flask import Blueprint, request, jsonify
-from app.utils.validation_utils import validate_employee_dynamic
+from app.utils.auth_utils import authenticate_request
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from app.models.column_mapping import ColumnMapping
+from app.models.employee import Employee
+from app.utils.additional_fields import (
+    PARAM_PREFIX as ADDITIONAL_PARAM_PREFIX,
+    AdditionalFieldQueryError,
+    parse_additional_filters,
+    parse_additional_sort,
+)
+from app.utils.change_feed import change_stream_events, memory_event_stream, open_stream_slot, publish_employee_change
+from app.utils.coercion import coerce_record
+from app.utils.ingest_governor import replace_in_progress
+from app.utils.query_fanout import QueryTimeoutError, run_concurrently
+from app.utils.validation_utils import COLUMN_VALIDATION_CONFIG, validate_employee_dynamic
 from bson import ObjectId
 from bson.errors import InvalidId
-import re
+import math
 from datetime import datetime
 
 employee_bp = Blueprint('employee', __name__, url_prefix='/api/employee')
+employee_bp.before_request(authenticate_request)
 
-def validate_employee(employee_data):
-    """Validate employee data"""
-    errors = []
-    
-    if not employee_data.get('NAME') or not employee_data['NAME'].strip():
-        errors.append('NAME is required')
-    
-    email = employee_data.get('EMAIL_ADDRESS', '').strip()
-    if not email or not is_valid_email(email):
-        errors.append('Valid EMAIL_ADDRESS is required')
-    
-    if not employee_data.get('ROLE') or not employee_data['ROLE'].strip():
-        errors.append('ROLE is required')
-    
-    if not employee_data.get('DEPARTMENT') or not employee_data['DEPARTMENT'].strip():
-        errors.append('DEPARTMENT is required')
-    
-    phone = employee_data.get('PHONE_NUMBER')
-    if not phone or not str(phone).isdigit():
-        errors.append('Valid PHONE_NUMBER is required')
-    
-    if employee_data.get('IS_PART_TIME') not in ['Yes', 'No']:
-        errors.append('IS_PART_TIME must be "Yes" or "No"')
-    
-    if employee_data.get('END_OF_PROBATION') not in ['Yes', 'No']:
-        errors.append('END_OF_PROBATION must be "Yes" or "No"')
-    
-    return errors
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
 
-def is_valid_email(email):
-    """Validate email format"""
-    pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-    return re.match(pattern, email) is not None
+# Coerced with the same rules as Excel ingest (app/utils/coercion.py), then validated
+MANDATORY_FIELDS = [rule['label'] for rule in COLUMN_VALIDATION_CONFIG if rule.get('required', True)]
+
+def reject_writes_during_replace():
+    """A full-refresh upload swaps the whole collection out, which would discard writes made meanwhile"""
+    if request.method in WRITE_METHODS and replace_in_progress():
+        response = jsonify({
+            'success': False,
+            'message': 'Employees are being replaced by a full-refresh upload; retry shortly'
+        })
+        response.headers['Retry-After'] = str(current_app.config['INGEST_RETRY_AFTER_SECONDS'])
+        return response, 503
+    return None
+
+employee_bp.before_request(reject_writes_during_replace)
 
 def serialize_employee(employee):
     """Convert MongoDB document to JSON serializable format"""
@@ -72,9 +70,29 @@ def get_employees():
         if is_part_time:
             filter_query['IS_PART_TIME'] = is_part_time
         
-        # Execute query
-        employees = list(mongo.db.employee.find(filter_query).skip(skip).limit(limit))
-        total = mongo.db.employee.count_documents(filter_query)
+        # Filters and sort on ADDITIONAL_FIELDS, limited to the columns the current mapping knows
+        sort = None
+        if request.args.get('sort') or any(key.startswith(ADDITIONAL_PARAM_PREFIX) for key in request.args):
+            mapping = ColumnMapping.latest() or {}
+            allowed_fields = list((mapping.get('non_required_columns') or {}).keys())
+            try:
+                filter_query.update(parse_additional_filters(request.args, allowed_fields))
+                sort = parse_additional_sort(request.args.get('sort'), allowed_fields)
+            except AdditionalFieldQueryError as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 400
+        
+        # Execute the page query and the count concurrently
+        collection = Employee.collection()
+        cursor = collection.find(filter_query)
+        if sort:
+            cursor = cursor.sort(sort)
+        employees, total = run_concurrently(
+            lambda: list(cursor.skip(skip).limit(limit)),
+            lambda: collection.count_documents(filter_query)
+        )
         
         # Serialize employees
         serialized_employees = [serialize_employee(emp) for emp in employees]
@@ -90,6 +108,12 @@ def get_employees():
             }
         }), 200
         
+    except QueryTimeoutError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Fetching employees timed out',
+            'error': str(e)
+        }), 504
     except Exception as e:
         return jsonify({
             'success': False,
@@ -139,34 +163,11 @@ def create_employee():
                 'message': 'No data provided'
             }), 400
         
-        # Define mandatory fields with their processing rules
-        mandatory_fields = {
-            'ROLE': lambda x: x.strip() if x else '',
-            'EMAIL_ADDRESS': lambda x: x.lower().strip() if x else '',
-            'NAME': lambda x: x.upper().strip() if x else '',
-            'IS_PART_TIME': lambda x: x,
-            'PHONE_NUMBER': lambda x: int(x) if str(x).isdigit() else None,
-            'DEPARTMENT': lambda x: x.strip() if x else '',
-            'END_OF_PROBATION': lambda x: x
-        }
-        
-        # Start with all incoming data (for dynamic fields)
-        employee_data = dict(data)
-        
-        # Process mandatory fields with their specific formatting rules
-        for field, processor in mandatory_fields.items():
-            if field in data:
-                employee_data[field] = processor(data[field])
-            else:
-                # Set default values for missing mandatory fields
-                if field == 'PHONE_NUMBER':
-                    employee_data[field] = None
-                else:
-                    employee_data[field] = ''
+        # All incoming data (for dynamic fields), in the same canonical form Excel ingest stores
+        employee_data = coerce_record(data)
         
         # Validate only the mandatory fields
-        mandatory_data = {field: employee_data[field] for field in mandatory_fields.keys()}
-        # validation_errors = validate_employee(mandatory_data)
+        mandatory_data = {field: employee_data.get(field) for field in MANDATORY_FIELDS}
         validation_errors = validate_employee_dynamic(mandatory_data)
         
         if validation_errors:
@@ -195,12 +196,13 @@ def create_employee():
         result = mongo.db.employee.insert_one(employee_data)
         
         # Fetch the created employee
-        new_employee = mongo.db.employee.find_one({'_id': result.inserted_id})
+        new_employee = serialize_employee(mongo.db.employee.find_one({'_id': result.inserted_id}))
+        publish_employee_change('employee.created', {'_id': new_employee['_id'], 'data': new_employee})
         
         return jsonify({
             'success': True,
             'message': 'Employee created successfully',
-            'data': serialize_employee(new_employee)
+            'data': new_employee
         }), 201
         
     except Exception as e:
@@ -237,35 +239,19 @@ def update_employee(employee_id):
                 'message': 'Employee not found'
             }), 404
         
-        # Define mandatory fields with their processing rules
-        mandatory_field_processors = {
-            'ROLE': lambda x: x.strip() if x else '',
-            'EMAIL_ADDRESS': lambda x: x.lower().strip() if x else '',
-            'NAME': lambda x: x.upper().strip() if x else '',
-            'IS_PART_TIME': lambda x: x,
-            'PHONE_NUMBER': lambda x: int(x) if str(x).isdigit() else None,
-            'DEPARTMENT': lambda x: x.strip() if x else '',
-            'END_OF_PROBATION': lambda x: x
-        }
-        
-        # Start with all incoming data (for dynamic fields)
-        update_data = dict(data)
-        
-        # Process mandatory fields if they're being updated
-        for field, processor in mandatory_field_processors.items():
-            if field in data:
-                update_data[field] = processor(data[field])
+        # All incoming data (for dynamic fields), in the same canonical form Excel ingest stores
+        update_data = coerce_record(data)
         
         # Merge with existing data for validation (only mandatory fields)
         merged_mandatory_data = {}
-        for field in mandatory_field_processors.keys():
+        for field in MANDATORY_FIELDS:
             if field in update_data:
                 merged_mandatory_data[field] = update_data[field]
             else:
                 merged_mandatory_data[field] = existing_employee.get(field)
         
         # Validate merged mandatory data
-        validation_errors = validate_employee(merged_mandatory_data)
+        validation_errors = validate_employee_dynamic(merged_mandatory_data)
         if validation_errors:
             return jsonify({
                 'success': False,
@@ -303,6 +289,7 @@ def update_employee(employee_id):
         
         # Fetch updated employee
         updated_employee = mongo.db.employee.find_one({'_id': ObjectId(employee_id)})
+        publish_employee_change('employee.updated', {'_id': employee_id, 'changes': update_data})
         
         return jsonify({
             'success': True,
@@ -344,6 +331,7 @@ def delete_employee(employee_id):
                 'success': False,
                 'message': 'Failed to delete employee'
             }), 500
+        publish_employee_change('employee.deleted', {'_id': employee_id})
         
         return jsonify({
             'success': True,
@@ -358,6 +346,31 @@ def delete_employee(employee_id):
             'error': str(e)
         }), 500
 
+# GET /api/employee/changes - Stream employee changes as server-sent events
+@employee_bp.route('/changes', methods=['GET'])
+def employee_changes():
+    # Browsers resend the last id they saw in Last-Event-ID when reconnecting
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if current_app.config['EMPLOYEE_CHANGE_STREAM']:
+        events = change_stream_events(mongo.db.employee, last_event_id)
+    else:
+        events = memory_event_stream(last_event_id)
+
+    # Each stream holds a worker thread; past the per-worker cap, turn subscribers away rather than starve other routes
+    events = open_stream_slot(events)
+    if events is None:
+        response = jsonify({
+            'success': False,
+            'message': 'Too many open change streams on this worker; retry later'
+        })
+        response.headers['Retry-After'] = str(math.ceil(current_app.config['EVENT_STREAM_MAX_SECONDS']))
+        return response, 503
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # GET /api/employees/search - Search employees
 @employee_bp.route('/search', methods=['GET'])
 def search_employees():
@@ -380,7 +393,7 @@ def search_employees():
             ]
         }
         
-        employees = list(mongo.find(search_filter).limit(20))
+        employees = list(mongo.db.employee.find(search_filter).limit(20))
         serialized_employees = [serialize_employee(emp) for emp in employees]
         
         return jsonify({
@@ -1,13 +1,18 @@
 from flask import Blueprint, request, jsonify
+from app.models.column_mapping import ColumnMapping
 from app.models.error_response import ErrorResponse
 from app import mongo
+from app.utils.auth_utils import authenticate_request
 from flask import Blueprint, request, jsonify
 from bson import ObjectId
 from bson.errors import InvalidId
 import re
-from datetime import datetime, timezone
 
 employee_column_mapping_bp = Blueprint('employee_column', __name__, url_prefix='/api/employee_column')
+employee_column_mapping_bp.before_request(authenticate_request)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
 
 def serialize_mongo_doc(doc):
     return {k: str(v) if isinstance(v, ObjectId) else v for k, v in doc.items()}
@@ -24,17 +29,30 @@ def serialize_staff_mapping(doc):
 
     return doc
 
-# GET /api/profile_mapping - Get all profile_mapping
+# GET /api/employee_column - Get mapping history, newest first
 @employee_column_mapping_bp.route('', methods=['GET'])
 def get_profile_mapping():
     try:
-        # Execute query to get all profile mappings
-        mappings = list(mongo.db.employee_column_mapping.find())
+        try:
+            page = max(int(request.args.get('page', 1)), 1)
+            limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'page and limit must be integers'
+            }), 400
+
+        mappings, total = ColumnMapping.history(page, limit)
         serialized_staff_mapping = [serialize_staff_mapping(staff) for staff in mappings]
         
         return jsonify({
             'success': True,
-            'data': serialized_staff_mapping
+            'data': serialized_staff_mapping,
+            'pagination': {
+                'page': page,
+                'limit': limit,
+                'total': total
+            }
         }), 200
         
     except Exception as e:
@@ -43,8 +61,54 @@ def get_profile_mapping():
             'message': 'Error fetching profile mappings',
             'error': str(e)
         }), 500
+
+# GET /api/employee_column/latest - Get the most recently used mapping
+@employee_column_mapping_bp.route('/latest', methods=['GET'])
+def get_latest_profile_mapping():
+    try:
+        mapping = ColumnMapping.latest()
+        if not mapping:
+            return jsonify({
+                'success': False,
+                'message': 'No profile mapping found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': serialize_staff_mapping(mapping)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching latest profile mapping',
+            'error': str(e)
+        }), 500
     
-# POST /api/profile_mapping - Update profile mapping by UUID
+def column_update_fields(data):
+    """
+    Build dotted $set paths for the columns in a mapping update.
+
+    Only the fields sent for each column are written, so edits to different
+    columns (or different fields of one column) do not overwrite each other.
+    """
+    fields = {}
+    for key in ('required_columns', 'non_required_columns'):
+        for column_data in data.get(key, []):
+            engine_name = str(column_data.get('engine_name') or '')
+            if not engine_name:
+                continue
+            if '.' in engine_name or engine_name.startswith('$'):
+                raise ValueError(f"Invalid engine_name: {engine_name}")
+
+            path = f"{key}.{engine_name}"
+            fields[f"{path}.engine_name"] = engine_name
+            for field in ('label', 'description'):
+                if field in column_data:
+                    fields[f"{path}.{field}"] = column_data[field]
+    return fields
+
+# POST /api/employee_column - Update profile mapping by UUID
 @employee_column_mapping_bp.route('', methods=['POST'])
 def update_profile_mapping():
     try:
@@ -56,93 +120,62 @@ def update_profile_mapping():
                 'success': False,
                 'message': 'UUID is required'
             }), 400
-        
-        # Find existing mapping
-        existing_mapping = mongo.db.employee_column_mapping.find_one({'uuid': mapping_uuid})
-        if not existing_mapping:
+
+        # Optimistic concurrency: clients must send the version they edited, in the body or If-Match
+        expected_version = data.get('version')
+        if expected_version is None and request.headers.get('If-Match'):
+            expected_version = request.headers['If-Match'].removeprefix('W/').strip('"')
+        if expected_version is None:
             return jsonify({
                 'success': False,
-                'message': 'Profile mapping not found'
-            }), 404
-        
-        # Get current columns
-        required_columns = existing_mapping.get('required_columns', {})
-        non_required_columns = existing_mapping.get('non_required_columns', {})
-        
-        # Process updates from request data (array format)
-        new_required = data.get('required_columns', [])
-        new_non_required = data.get('non_required_columns', [])
-        
-        # Update required columns from array
-        for column_data in new_required:
-            engine_name = column_data.get('engine_name')
-            if not engine_name:
-                continue
-                
-            if engine_name in required_columns:
-                # Update existing (preserve engine_name)
-                required_columns[engine_name]['label'] = column_data.get('label', required_columns[engine_name]['label'])
-                required_columns[engine_name]['description'] = column_data.get('description', required_columns[engine_name]['description'])
-            else:
-                # Add new column
-                required_columns[engine_name] = {
-                    'label': column_data.get('label', ''),
-                    'engine_name': engine_name,
-                    'description': column_data.get('description', '')
-                }
-        
-        # Update non-required columns from array
-        for column_data in new_non_required:
-            engine_name = column_data.get('engine_name')
-            if not engine_name:
-                continue
-                
-            if engine_name in non_required_columns:
-                # Update existing (preserve engine_name)
-                non_required_columns[engine_name]['label'] = column_data.get('label', non_required_columns[engine_name]['label'])
-                non_required_columns[engine_name]['description'] = column_data.get('description', non_required_columns[engine_name]['description'])
-            else:
-                # Add new column
-                non_required_columns[engine_name] = {
-                    'label': column_data.get('label', ''),
-                    'engine_name': engine_name,
-                    'description': column_data.get('description', '')
-                }
-        
-        # Increment version
-        new_version = str(int(existing_mapping.get('version', '1')) + 1)
-        
-        # Update document
-        updated_mapping = {
-            'required_columns': required_columns,
-            'non_required_columns': non_required_columns,
-            'created_at': existing_mapping.get('created_at'),
-            'updated_at': datetime.now(timezone.utc),
-            'uuid': mapping_uuid,
-            'version': new_version
-        }
-        
-        result = mongo.db.employee_column_mapping.update_one(
-            {'uuid': mapping_uuid},
-            {'$set': updated_mapping}
-        )
-        
-        if result.modified_count > 0:
+                'message': 'version (or an If-Match header) is required'
+            }), 428
+        try:
+            expected_version = int(expected_version)
+        except (TypeError, ValueError):
             return jsonify({
-                'success': True,
-                'message': 'Profile mapping updated successfully',
-                'data': {
-                    'uuid': mapping_uuid,
-                    'version': new_version,
-                    'required_columns': required_columns,
-                    'non_required_columns': non_required_columns
-                }
-            }), 200
-        else:
+                'success': False,
+                'message': 'version must be an integer'
+            }), 400
+
+        try:
+            fields = column_update_fields(data)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+
+        if not fields:
             return jsonify({
                 'success': False,
                 'message': 'No changes made to profile mapping'
             }), 400
+
+        updated_mapping = ColumnMapping.update_columns(mapping_uuid, fields, expected_version)
+        if not updated_mapping:
+            existing_mapping = ColumnMapping.get_by_uuid(mapping_uuid)
+            if not existing_mapping:
+                return jsonify({
+                    'success': False,
+                    'message': 'Profile mapping not found'
+                }), 404
+            return jsonify({
+                'success': False,
+                'message': 'Profile mapping was modified by another request',
+                'current_version': existing_mapping.get('version')
+            }), 409
+
+        return jsonify({
+            'success': True,
+            'message': 'Profile mapping updated successfully',
+            'data': {
+                'uuid': mapping_uuid,
+                'version': updated_mapping['version'],
+                'required_columns': updated_mapping.get('required_columns', {}),
+                'non_required_columns': updated_mapping.get('non_required_columns', {})
+            }
+        }), 200
             
     except Exception as e:
         return jsonify({
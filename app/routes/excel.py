@@ -1,18 +1,27 @@
-from datetime import datetime, timezone
-import uuid
+import json
 from flask import Blueprint, send_file, current_app, request, jsonify
+from pymongo import ReplaceOne
 from werkzeug.utils import secure_filename
-import pandas as pd
 import os
 import logging
-from app.factory.dynamic_excel_factory import ExcelModelFactory
+import tempfile
+from contextlib import nullcontext
+from app.models.column_mapping import ColumnMapping
+from app.models.employee import Employee
 from app.models.error_response import ErrorResponse
 from app import mongo
-from app.utils.validation_utils import COLUMN_VALIDATION_CONFIG
+from app.utils.auth_utils import authenticate_request
+from app.utils.change_feed import publish_employee_change
+from app.utils.column_plan import column_plan_for
+from app.utils.ingest_governor import IngestBusyError, exclusive_ingest, ingest_slot
+from app.utils.validation_utils import COLUMN_VALIDATION_CONFIG, validate_data
+from app.utils.metrics import INGEST_BYTES_READ, INGEST_ROWS_PARSED, INGEST_ROWS_UPSERTED
+from app.utils.timing import span, start_request_timer
 
 SAMPLE_EXCEL_FILE = 'Sample Excel.xlsx'
 
 excel_bp = Blueprint('excel', __name__, url_prefix='/api/excel')
+excel_bp.before_request(authenticate_request)
 logger = logging.getLogger(__name__)
 
 
@@ -53,8 +62,19 @@ def download_excel():
         print(f"Error downloading file {SAMPLE_EXCEL_FILE}: {e}")
         return "Internal server error", 500
     
+UPLOAD_MODES = ('upsert', 'replace', 'preview')
+
 @excel_bp.route('/upload', methods=['POST'])
 def upload_excel():
+    # ?mode=upsert (default) merges the file into the employees, ?mode=replace swaps in the file as
+    # the complete employee set, ?mode=preview validates the first rows without writing
+    mode = request.args.get('mode', 'upsert')
+    if mode not in UPLOAD_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid mode. Allowed modes are: {', '.join(UPLOAD_MODES)}"
+        }), 400
+
     # Check if the post request has the file part
 
 
@@ -63,7 +83,6 @@ def upload_excel():
             'success': False,
             'error': 'No file part in the request'
         }), 400
-    logger.info(f"Error here")
     # Only the first file is processed
     
     file_keys = list(request.files.keys())
@@ -75,79 +94,9 @@ def upload_excel():
     if file and allowed_file(file.filename):
         try:
             filename = secure_filename(file.filename)
-            
-            # Make sure the resource directory exists
-            resource_dir = os.path.join(current_app.root_path, current_app.config['RESOURCE_FOLDER'])
-            os.makedirs(resource_dir, exist_ok=True)
-            
-            # Construct full file path
-            filepath = os.path.join(resource_dir, filename)
-            logger.info(f"Saving file to: {filepath}")
-            
-            # Save the file
-            file.save(filepath)
-            
-            # Process the Excel file
-            dynamic_excel_model_list = ExcelModelFactory.from_excel_file(filepath)
-
-            # Convert
-            required_columns = [col['label'] for col in COLUMN_VALIDATION_CONFIG if col['required']]
-
-            dynamic_excel_columns = dynamic_excel_model_list[0].get_columns()
-            validate_store_columns(required_columns, dynamic_excel_columns)
-            # Insert the objects into MongoDB
-            try:
-                collection = mongo.db.employee  # Replace with your collection name
-                
-                # Process each document individually for upsert operation
-                upserted_count = 0
-                updated_count = 0
-                
-                for model in dynamic_excel_model_list:
-                    document = model.to_dict()
-                    # Assuming email is the unique identifier
-                    email = document.get('EMAIL_ADDRESS')
-                    phone_number = document.get('PHONE_NUMBER')
-                    
-                    if not email:
-                        logger.warning("Document missing email field, skipping...")
-                        continue
-                        
-                    # Use upsert to update if exists, create if doesn't
-                    result = collection.replace_one(
-                        {
-                            "EMAIL_ADDRESS": email,
-                            "PHONE_NUMBER": phone_number  # Both conditions must match
-                        },
-                        document,  # Update operation
-                        upsert=True  # Create if doesn't exist
-                    )
-                    
-                    if result.upserted_id:
-                        upserted_count += 1
-                    elif result.modified_count > 0:
-                        updated_count += 1
-                
-                logger.info(f"Operation completed: {upserted_count} new documents created, {updated_count} existing documents updated.")
-                
-            except Exception as e:
-                logger.error(f"Error upserting documents into MongoDB: {str(e)}")
-                raise ErrorResponse(
-                    title="Database Error",
-                    status=500,
-                    detail="Failed to upsert documents into the database.",
-                    errors=str(e)
-                )
-
-            # Example processing: Get basic info about the file
-            file_info = {
-                'filename': filename,
-                'rows': len(dynamic_excel_model_list),
-                'columns': len(dynamic_excel_model_list[0].get_columns()),
-                'column_names': dynamic_excel_model_list[0].get_columns(),
-                # 'preview': df.head(5).to_dict(orient='records')
-            }
-
+            if mode == 'preview':
+                return preview_upload(file, filename)
+            file_info = save_and_ingest(filename, file.save, mode)
             logger.info(f"Successfully processed file: {filename}")
 
             # Return JSON response
@@ -172,7 +121,291 @@ def upload_excel():
             'error': f'Invalid file type. Allowed file types are: {allowed}'
         }), 400
     
-def validate_store_columns(default_required_columns, excel_columns):
+def preview_upload(file, filename):
+    """
+    Dry run of an upload: read the header and the first rows straight from the
+    request, then report the column mapping, sample documents and validation
+    errors. Nothing is saved or written to the database.
+    """
+    try:
+        rows = int(request.args.get('rows', current_app.config['UPLOAD_PREVIEW_ROWS']))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'rows must be an integer'
+        }), 400
+    rows = min(max(rows, 1), current_app.config['UPLOAD_PREVIEW_MAX_ROWS'])
+
+    timer = start_request_timer(trace_memory=current_app.config['TRACEMALLOC_SPANS'])
+    with timer.activate():
+        from app.factory.dynamic_excel_factory import ExcelModelFactory
+        # nrows lets the reader stop after the preview rows instead of loading the whole sheet
+        df = ExcelModelFactory.read_excel(file.stream, nrows=rows)
+        plan = column_plan_for(df.columns)
+        models = ExcelModelFactory.from_dataframe(df, plan, validate=False)
+
+        column_labels = plan.column_labels(df.columns)
+        required_columns = [col['label'] for col in COLUMN_VALIDATION_CONFIG if col['required']]
+        column_errors = []
+        mapping = None
+        try:
+            with span('build_column_mapping'):
+                required, non_required = build_column_mapping(required_columns, list(column_labels), column_labels)
+            fingerprint = ColumnMapping.fingerprint(list(required) + list(non_required))
+            existing = ColumnMapping.get_by_fingerprint(fingerprint)
+            mapping = {
+                'fingerprint': fingerprint,
+                'existing_uuid': existing['uuid'] if existing else None,
+                'required_columns': list(required.values()),
+                'non_required_columns': list(non_required.values())
+            }
+        except ErrorResponse as e:
+            column_errors.append(e.detail)
+
+        with span('validate_rows'):
+            samples = [model.to_dict() for model in models]
+            row_errors = []
+            for index, document in enumerate(samples):
+                errors = validate_data(document, COLUMN_VALIDATION_CONFIG)
+                if errors:
+                    # Row numbers as shown in Excel: the header is row 1
+                    row_errors.append({'row': index + 2, 'errors': errors})
+
+    return jsonify({
+        'success': True,
+        'message': 'Preview only; nothing was saved',
+        'file_info': {
+            'filename': filename,
+            'mode': 'preview',
+            'rows_previewed': len(samples),
+            'valid': not column_errors and not row_errors,
+            'column_errors': column_errors,
+            'row_errors': row_errors,
+            'mapping': mapping,
+            'sample': samples,
+            'timings': timer.to_dict()
+        }
+    }), 200
+
+def save_and_ingest(filename, save, mode='upsert'):
+    """
+    Store an upload in the resource directory with `save(filepath)` and ingest
+    it in the given mode ('upsert' or 'replace'), recording per-stage timings.
+
+    Each upload gets its own file, so concurrent uploads with the same name
+    cannot overwrite each other mid-parse; it is deleted once ingested.
+    
+    Returns:
+        Dictionary describing the ingested file, including its timings
+    """
+    # Make sure the resource directory exists
+    resource_dir = os.path.join(current_app.root_path, current_app.config['RESOURCE_FOLDER'])
+    os.makedirs(resource_dir, exist_ok=True)
+
+    fd, filepath = tempfile.mkstemp(dir=resource_dir, prefix='upload_', suffix=f'_{filename}')
+    os.close(fd)
+    try:
+        return ingest_upload(filepath, filename, mode, save)
+    finally:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+def ingest_upload(filepath, filename, mode='upsert', save=None):
+    """
+    Ingest the workbook at `filepath` under an ingest slot, first writing it
+    there with `save(filepath)` if given, and attach per-stage timings.
+    
+    Returns:
+        Dictionary describing the ingested file, including its timings
+    """
+    timer = start_request_timer(trace_memory=current_app.config['TRACEMALLOC_SPANS'])
+    # Raises IngestBusyError (429) when every ingest slot stays taken
+    with timer.activate(), ingest_slot() as lease:
+        if save:
+            logger.info(f"Saving file to: {filepath}")
+            with span('save'):
+                save(filepath)
+        
+        file_info = ingest_file(filepath, filename, lease, mode)
+
+    file_info['timings'] = timer.to_dict()
+    logger.info(json.dumps({'event': 'upload_timings', 'filename': filename, **file_info['timings']}))
+    return file_info
+
+def ingest_file(filepath, filename, lease=None, mode='upsert'):
+    """
+    Parse a saved workbook, store its column mapping and upsert its rows into
+    the employee collection. With an ingest lease, upsert batches are paced to
+    its share of the write budget. In 'replace' mode the workbook becomes the
+    complete employee set instead (see Employee.replace_all).
+    
+    Returns:
+        Dictionary describing the ingested file
+    """
+    INGEST_BYTES_READ.inc(os.path.getsize(filepath))
+    
+    # Process the Excel file. The factory pulls in pandas/openpyxl, so it is
+    # imported on first use to keep API-only workers light.
+    from app.factory.dynamic_excel_factory import ExcelModelFactory
+    df = ExcelModelFactory.read_excel(filepath)
+    # Headers are renamed through this layout's mapping, so relabelled columns land on their engine names
+    plan = column_plan_for(df.columns)
+    dynamic_excel_model_list = ExcelModelFactory.from_dataframe(df, plan)
+    INGEST_ROWS_PARSED.inc(len(dynamic_excel_model_list))
+
+    # Convert
+    required_columns = [col['label'] for col in COLUMN_VALIDATION_CONFIG if col['required']]
+
+    column_labels = plan.column_labels(df.columns)
+    with span('validate_store_columns'):
+        validate_store_columns(required_columns, list(column_labels), column_labels)
+
+    if mode == 'replace':
+        employees = _replace_employees(dynamic_excel_model_list, filename, lease)
+        return {
+            'filename': filename,
+            'mode': mode,
+            'rows': len(dynamic_excel_model_list),
+            'employees': employees,
+            'columns': len(dynamic_excel_model_list[0].get_columns()),
+            'column_names': dynamic_excel_model_list[0].get_columns()
+        }
+
+    # Insert the objects into MongoDB
+    try:
+        collection = Employee.collection()
+        
+        upserted_count = 0
+        updated_count = 0
+        batch_size = current_app.config['INGEST_UPSERT_BATCH_SIZE']
+        
+        with span('upsert'):
+            batch = []
+            for model in dynamic_excel_model_list:
+                document = model.to_dict()
+                # Assuming email is the unique identifier
+                email = document.get('EMAIL_ADDRESS')
+                phone_number = document.get('PHONE_NUMBER')
+                
+                if not email:
+                    logger.warning("Document missing email field, skipping...")
+                    continue
+                    
+                # Use upsert to update if exists, create if doesn't
+                batch.append(ReplaceOne(
+                    {
+                        "EMAIL_ADDRESS": email,
+                        "PHONE_NUMBER": phone_number  # Both conditions must match
+                    },
+                    document,
+                    upsert=True
+                ))
+                if len(batch) >= batch_size:
+                    upserted, updated = _write_upsert_batch(collection, batch, lease)
+                    upserted_count += upserted
+                    updated_count += updated
+                    batch = []
+            if batch:
+                upserted, updated = _write_upsert_batch(collection, batch, lease)
+                upserted_count += upserted
+                updated_count += updated
+        
+        INGEST_ROWS_UPSERTED.inc(upserted_count + updated_count)
+        publish_employee_change('employee.bulk_upserted', {
+            'filename': filename,
+            'rows': len(dynamic_excel_model_list),
+            'upserted': upserted_count,
+            'updated': updated_count
+        })
+        logger.info(f"Operation completed: {upserted_count} new documents created, {updated_count} existing documents updated.")
+        
+    except Exception as e:
+        logger.error(f"Error upserting documents into MongoDB: {str(e)}")
+        raise ErrorResponse(
+            title="Database Error",
+            status=500,
+            detail="Failed to upsert documents into the database.",
+            errors=str(e)
+        )
+
+    # Example processing: Get basic info about the file
+    return {
+        'filename': filename,
+        'mode': mode,
+        'rows': len(dynamic_excel_model_list),
+        'columns': len(dynamic_excel_model_list[0].get_columns()),
+        'column_names': dynamic_excel_model_list[0].get_columns(),
+        # 'preview': df.head(5).to_dict(orient='records')
+    }
+
+def _replace_employees(models, filename, lease=None):
+    """Swap in the workbook rows as the complete employee collection; returns the employee count"""
+    # Later rows win for a repeated EMAIL_ADDRESS + PHONE_NUMBER, as they do when upserting
+    documents = {}
+    for model in models:
+        document = model.to_dict()
+        if not document.get('EMAIL_ADDRESS'):
+            logger.warning("Document missing email field, skipping...")
+            continue
+        documents[(document['EMAIL_ADDRESS'], document.get('PHONE_NUMBER'))] = document
+
+    if not documents:
+        raise ErrorResponse(
+            title="Validation Error",
+            status=400,
+            detail="Replace mode needs at least one row with an EMAIL_ADDRESS.",
+            errors="No employees found in Excel file"
+        )
+
+    try:
+        # Hold every ingest slot (waiting for running upserts) so no other ingest writes to the
+        # collection being swapped out; employee write routes return 503 meanwhile
+        with exclusive_ingest(lease) if lease is not None else nullcontext():
+            with span('replace'):
+                employees = Employee.replace_all(
+                    list(documents.values()),
+                    batch_size=current_app.config['INGEST_UPSERT_BATCH_SIZE'],
+                    on_batch=lease.pace if lease is not None else None
+                )
+    except IngestBusyError:
+        raise
+    except Exception as e:
+        logger.error(f"Error replacing employee collection: {str(e)}")
+        raise ErrorResponse(
+            title="Database Error",
+            status=500,
+            detail="Failed to replace the employee collection; the existing employees were left unchanged.",
+            errors=str(e)
+        )
+
+    INGEST_ROWS_UPSERTED.inc(employees)
+    publish_employee_change('employee.replaced', {
+        'filename': filename,
+        'rows': len(models),
+        'employees': employees
+    })
+    logger.info(f"Replace completed: employee collection now holds {employees} documents.")
+    return employees
+
+def _write_upsert_batch(collection, batch, lease=None):
+    """Write one batch of ReplaceOne upserts in file order; returns (upserted, updated) counts"""
+    result = collection.bulk_write(batch, ordered=True)
+    if lease is not None:
+        lease.pace(len(batch))
+    return result.upserted_count, result.modified_count
+
+def build_column_mapping(default_required_columns, excel_columns, labels=None):
+    """
+    Check required columns and split the header set into required and
+    non-required column mappings, without touching the database.
+
+    `labels` optionally maps each column to the header label shown in the
+    workbook; by default the column name itself is the label.
+    
+    Returns:
+        (required_columns, non_required_columns) dictionaries keyed by engine name
+    """
+    labels = labels or {}
     snake_case_columns = [col.upper().replace(' ', '_') for col in excel_columns]
     missing_columns = [col for col in default_required_columns if col not in snake_case_columns]
     if missing_columns:
@@ -185,7 +418,7 @@ def validate_store_columns(default_required_columns, excel_columns):
     required_columns = {}
     non_required_columns = {}
     for i, snake_col in enumerate(snake_case_columns):
-        original_label = excel_columns[i]
+        original_label = labels.get(excel_columns[i], excel_columns[i])
         if snake_col in default_required_columns:
             required_columns[snake_col] = {
                 'label': original_label,
@@ -198,23 +431,19 @@ def validate_store_columns(default_required_columns, excel_columns):
             'engine_name': snake_col,
             'description': ''
         }
+    return required_columns, non_required_columns
 
-    # Create column mapping document
-    column_mapping = {
-        'required_columns': required_columns,
-        'non_required_columns': non_required_columns,
-        'created_at': datetime.now(timezone.utc),
-        'uuid': str(uuid.uuid4()),
-        'version': '1'
-    }
+def validate_store_columns(default_required_columns, excel_columns, labels=None):
+    """Check required columns and register the column mapping for this header set."""
+    required_columns, non_required_columns = build_column_mapping(default_required_columns, excel_columns, labels)
 
-    # Insert column mapping into MongoDB
+    # Reuse the stored mapping when this header set has been seen before
     try:
-        collection = mongo.db.employee_column_mapping
-        result = collection.insert_one(column_mapping)
-        logger.info(f"Inserted profile mapping column mapping with _id: {result.inserted_id}")
+        column_mapping = ColumnMapping.register(required_columns, non_required_columns)
+        logger.info(f"Using column mapping {column_mapping['uuid']} (version {column_mapping['version']})")
+        return column_mapping
     except Exception as e:
-        logger.error(f"Error inserting column mapping into MongoDB: {str(e)}")
+        logger.error(f"Error storing column mapping in MongoDB: {str(e)}")
         raise ErrorResponse(
             title="Database Error",
             status=500,
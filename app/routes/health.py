@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pymongo
+from flask import Blueprint, current_app, jsonify
+
+from app import mongo
+
+health_bp = Blueprint('health', __name__)
+
+# Last Mongo ping result for this worker, so frequent probes don't each hit the database
+_readiness = {'checked_at': 0.0, 'ready': False, 'error': None}
+_readiness_lock = threading.Lock()
+
+
+def check_mongo(cache_seconds, timeout_seconds):
+    """Ping MongoDB, reusing a result younger than `cache_seconds`; returns (ready, error)"""
+    with _readiness_lock:
+        if time.monotonic() - _readiness['checked_at'] < cache_seconds:
+            return _readiness['ready'], _readiness['error']
+        try:
+            with pymongo.timeout(timeout_seconds):
+                mongo.db.command('ping')
+            ready, error = True, None
+        except Exception as e:
+            ready, error = False, str(e)
+        _readiness.update(checked_at=time.monotonic(), ready=ready, error=error)
+        return ready, error
+
+
+# GET /healthz - Liveness: the worker is serving requests
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({'success': True, 'status': 'ok'}), 200
+
+
+# GET /readyz - Readiness: the worker can reach MongoDB
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    ready, error = check_mongo(
+        current_app.config['READINESS_CACHE_SECONDS'],
+        current_app.config['READINESS_PING_TIMEOUT_SECONDS']
+    )
+    if not ready:
+        return jsonify({
+            'success': False,
+            'status': 'unavailable',
+            'message': 'MongoDB is unreachable',
+            'error': error
+        }), 503
+    return jsonify({'success': True, 'status': 'ready'}), 200
@@ -0,0 +1,47 @@
+import hmac
+from flask import Blueprint, current_app, request, jsonify
+from app.utils.mongo_monitoring import pool_metrics
+
+internal_bp = Blueprint('internal', __name__, url_prefix='/internal')
+
+def check_internal_token():
+    expected = current_app.config.get('INTERNAL_API_TOKEN')
+    if not expected:
+        # Fail closed: these endpoints expose Mongo command stats and profiling data
+        if current_app.config.get('INTERNAL_ENDPOINTS_PUBLIC'):
+            return None
+        return jsonify({
+            'success': False,
+            'message': 'Not found'
+        }), 404
+    # Prometheus can only send the token as a bearer credential
+    provided = request.headers.get('X-Internal-Token', '')
+    authorization = request.headers.get('Authorization', '')
+    if not provided and authorization.startswith('Bearer '):
+        provided = authorization[len('Bearer '):]
+    if not hmac.compare_digest(provided, expected):
+        return jsonify({
+            'success': False,
+            'message': 'Forbidden'
+        }), 403
+    return None
+
+internal_bp.before_request(check_internal_token)
+
+# GET /internal/mongo/pool - Connection pool metrics for this worker process
+@internal_bp.route('/mongo/pool', methods=['GET'])
+def mongo_pool():
+    config = current_app.config
+    return jsonify({
+        'success': True,
+        'data': {
+            'settings': {
+                'max_pool_size': config.get('MONGO_MAX_POOL_SIZE'),
+                'min_pool_size': config.get('MONGO_MIN_POOL_SIZE'),
+                'wait_queue_timeout_ms': config.get('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+                'server_selection_timeout_ms': config.get('MONGO_SERVER_SELECTION_TIMEOUT_MS'),
+                'compressors': config.get('MONGO_COMPRESSORS') or None
+            },
+            **pool_metrics.snapshot()
+        }
+    }), 200
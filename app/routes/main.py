@@ -3,17 +3,37 @@ from app.models.user import User
 
 main_bp = Blueprint('main', __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 @main_bp.route('/')
 def index():
     return render_template('index.html')
 
 @main_bp.route('/api/users', methods=['GET'])
 def get_users():
-    users = User.get_all()
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer'}), 400
+    after = request.args.get('after')
+    email_prefix = request.args.get('email_prefix')
+    
+    try:
+        users, next_cursor = User.list_page(limit=limit, after=after, email_prefix=email_prefix)
+    except ValueError:
+        return jsonify({'message': 'Invalid cursor'}), 400
     # Convert ObjectId to string for JSON serialization
     for user in users:
         user['_id'] = str(user['_id'])
-    return jsonify(users)
+    return jsonify({
+        'success': True,
+        'data': users,
+        'pagination': {
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
+    })
 
 @main_bp.route('/api/users', methods=['POST'])
 def create_user():
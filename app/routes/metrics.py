@@ -0,0 +1,12 @@
+from flask import Blueprint, Response
+from app.routes.internal import check_internal_token
+from app.utils.metrics import render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+metrics_bp.before_request(check_internal_token)
+
+# GET /metrics - Prometheus scrape endpoint
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    body, content_type = render_metrics()
+    return Response(body, mimetype=content_type)
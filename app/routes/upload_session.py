@@ -0,0 +1,253 @@
+import logging
+import os
+from datetime import timedelta
+
+from flask import Blueprint, current_app, g, jsonify, request
+from werkzeug.utils import secure_filename
+
+from app.models.error_response import ErrorResponse
+from app.models.upload_session import COMPLETED, FAILED, UploadSession
+from app.routes.excel import allowed_file, ingest_upload
+from app.utils.auth_utils import authenticate_request
+from app.utils.ingest_governor import IngestBusyError
+from app.utils.upload_spool import ChunkError, file_sha256, purge_stale_spool_files, write_chunk
+
+upload_session_bp = Blueprint('upload_session', __name__, url_prefix='/api/excel/upload/sessions')
+upload_session_bp.before_request(authenticate_request)
+logger = logging.getLogger(__name__)
+
+# Preview reads from the request itself, so it has no chunked equivalent
+INGEST_MODES = ('upsert', 'replace')
+
+
+def serialize_session(session):
+    return {
+        'session_id': session['session_id'],
+        'filename': session['filename'],
+        'size': session['size'],
+        'offset': session['offset'],
+        'status': session['status'],
+        'mode': session.get('mode', 'upsert'),
+        'error': session.get('error'),
+        'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE'],
+        'max_chunk_bytes': current_app.config['UPLOAD_MAX_CHUNK_BYTES'],
+        'expires_at': session['expires_at'].isoformat()
+    }
+
+
+def _not_found():
+    return jsonify({
+        'success': False,
+        'message': 'Upload session not found'
+    }), 404
+
+
+def _offset_conflict(session, message):
+    return jsonify({
+        'success': False,
+        'message': message,
+        'data': serialize_session(session)
+    }), 409
+
+
+# POST /api/excel/upload/sessions - Start a resumable upload
+@upload_session_bp.route('', methods=['POST'])
+def create_session():
+    try:
+        data = request.get_json() or {}
+        filename = secure_filename(str(data.get('filename') or ''))
+        if not filename or not allowed_file(filename):
+            allowed = ', '.join(current_app.config['ALLOWED_EXTENSIONS'])
+            return jsonify({
+                'success': False,
+                'message': f'Invalid file type. Allowed file types are: {allowed}'
+            }), 400
+
+        try:
+            size = int(data.get('size'))
+        except (TypeError, ValueError):
+            size = 0
+        if size <= 0 or size > current_app.config['UPLOAD_MAX_FILE_BYTES']:
+            return jsonify({
+                'success': False,
+                'message': f"size must be between 1 and {current_app.config['UPLOAD_MAX_FILE_BYTES']} bytes"
+            }), 400
+
+        sha256 = data.get('sha256')
+        if sha256 is not None and (len(str(sha256)) != 64 or not all(c in '0123456789abcdef' for c in str(sha256).lower())):
+            return jsonify({
+                'success': False,
+                'message': 'sha256 must be a hex digest'
+            }), 400
+
+        # How finalize ingests the file, as for /api/excel/upload?mode=
+        mode = data.get('mode', 'upsert')
+        if mode not in INGEST_MODES:
+            return jsonify({
+                'success': False,
+                'message': f"mode must be one of: {', '.join(INGEST_MODES)}"
+            }), 400
+
+        spool_dir = current_app.config['UPLOAD_SESSION_DIR']
+        os.makedirs(spool_dir, exist_ok=True)
+        purge_stale_spool_files(spool_dir, timedelta(hours=current_app.config['UPLOAD_SESSION_TTL_HOURS']).total_seconds())
+
+        user = getattr(g, 'current_user', None)
+        session = UploadSession.create(filename, size, sha256.lower() if sha256 else None, user and user.get('_id'), mode)
+        return jsonify({
+            'success': True,
+            'data': serialize_session(session)
+        }), 201
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error creating upload session',
+            'error': str(e)
+        }), 500
+
+
+# GET /api/excel/upload/sessions/<session_id> - Get the committed offset to resume from
+@upload_session_bp.route('/<session_id>', methods=['GET'])
+def get_session(session_id):
+    try:
+        session = UploadSession.get(session_id)
+        if not session:
+            return _not_found()
+        return jsonify({
+            'success': True,
+            'data': serialize_session(session)
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching upload session',
+            'error': str(e)
+        }), 500
+
+
+# PUT /api/excel/upload/sessions/<session_id>?offset=<n> - Append one chunk (X-Chunk-SHA256 header required)
+@upload_session_bp.route('/<session_id>', methods=['PUT'])
+def put_chunk(session_id):
+    try:
+        try:
+            offset = int(request.args.get('offset', ''))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'offset query parameter must be an integer'
+            }), 400
+
+        checksum = request.headers.get('X-Chunk-SHA256')
+        if not checksum:
+            return jsonify({
+                'success': False,
+                'message': 'X-Chunk-SHA256 header is required'
+            }), 400
+
+        length = request.content_length
+        if not length:
+            return jsonify({
+                'success': False,
+                'message': 'Content-Length is required and must be positive'
+            }), 411
+        if length > current_app.config['UPLOAD_MAX_CHUNK_BYTES']:
+            return jsonify({
+                'success': False,
+                'message': f"Chunks may be at most {current_app.config['UPLOAD_MAX_CHUNK_BYTES']} bytes"
+            }), 413
+
+        session = UploadSession.claim_chunk(session_id, offset)
+        if not session:
+            session = UploadSession.get(session_id)
+            if not session:
+                return _not_found()
+            return _offset_conflict(session, 'Chunk does not start at the committed offset, or another chunk is being written')
+
+        if offset + length > session['size']:
+            UploadSession.release(session_id)
+            return jsonify({
+                'success': False,
+                'message': 'Chunk extends past the declared file size'
+            }), 400
+
+        try:
+            write_chunk(UploadSession.spool_path(session_id), offset, request.stream, length, checksum)
+        except ChunkError as e:
+            UploadSession.release(session_id)
+            return jsonify({
+                'success': False,
+                'message': str(e),
+                'data': {'offset': offset}
+            }), 422
+        except Exception:
+            UploadSession.release(session_id)
+            raise
+
+        session = UploadSession.commit_chunk(session_id, offset, length)
+        return jsonify({
+            'success': True,
+            'data': serialize_session(session)
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error writing chunk for upload session {session_id}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Error writing chunk',
+            'error': str(e)
+        }), 500
+
+
+# POST /api/excel/upload/sessions/<session_id>/complete - Verify the file and ingest it
+@upload_session_bp.route('/<session_id>/complete', methods=['POST'])
+def complete_session(session_id):
+    session = UploadSession.get(session_id)
+    if not session:
+        return _not_found()
+
+    if not UploadSession.claim_finalize(session_id, session['size']):
+        session = UploadSession.get(session_id)
+        return _offset_conflict(session, 'Upload is incomplete, busy or already finalized')
+
+    spool_path = UploadSession.spool_path(session_id)
+    keep_spool = False
+    try:
+        if session.get('sha256') and file_sha256(spool_path) != session['sha256']:
+            raise ErrorResponse(
+                title="Validation Error",
+                status=422,
+                detail="Uploaded file does not match its sha256 checksum.",
+                errors="Checksum mismatch"
+            )
+
+        # The spool file is unique to this session, so it is ingested where it is
+        file_info = ingest_upload(spool_path, session['filename'], session.get('mode', 'upsert'))
+        UploadSession.finish(session_id, COMPLETED)
+        logger.info(f"Successfully processed upload session {session_id}: {session['filename']}")
+
+        return jsonify({
+            'success': True,
+            'message': 'File uploaded successfully',
+            'file_info': file_info
+        }), 200
+
+    except IngestBusyError as e:
+        # Nothing was ingested; keep the upload so the client can retry finalize after Retry-After
+        keep_spool = True
+        UploadSession.reopen(session_id)
+        return e.to_response()
+    except ErrorResponse as e:
+        UploadSession.finish(session_id, FAILED, e.detail)
+        return e.to_response()
+    except Exception as e:
+        logger.error(f"Error processing upload session {session_id}: {str(e)}")
+        UploadSession.finish(session_id, FAILED, str(e))
+        return jsonify({
+            'success': False,
+            'error': f'File processing error {str(e)}'
+        }), 400
+    finally:
+        if not keep_spool and os.path.exists(spool_path):
+            os.remove(spool_path)
@@ -0,0 +1,198 @@
+from flask import Blueprint, request, jsonify
+from app import mongo
+from app.config import Config
+from app.models.worker import Worker, parse_date
+from app.utils.auth_utils import authenticate_request
+from app.utils.cache_utils import TTLCache
+from app.utils.leave_calendar import LeaveCalendar
+from app.utils.shift_scheduler import ShiftDemandError, ShiftScheduler, parse_demands
+
+worker_bp = Blueprint('worker', __name__, url_prefix='/api/worker')
+worker_bp.before_request(authenticate_request)
+
+MAX_MATRIX_DAYS = 366
+MAX_SHIFT_DEMANDS = 100000
+
+WORKER_PROJECTION = {'name': 1, 'skillset': 1, 'probation': 1, 'leave_request': 1}
+
+# The leave calendar is rebuilt from Mongo at most once per TTL per worker process
+_calendar_cache = TTLCache(ttl_seconds=Config.AVAILABILITY_CACHE_TTL_SECONDS, max_size=1)
+
+def load_leave_calendar():
+    """Get the workforce leave calendar, loading workers from Mongo when the cache is cold"""
+    calendar = _calendar_cache.get('calendar')
+    if calendar is None:
+        workers, ids = [], []
+        for doc in mongo.db.worker.find({}, WORKER_PROJECTION):
+            workers.append(Worker.from_dict(doc))
+            ids.append(str(doc['_id']))
+        calendar = LeaveCalendar(workers, ids)
+        _calendar_cache.set('calendar', calendar)
+    return calendar
+
+def serialize_worker(calendar, index):
+    worker = calendar.workers[index]
+    return {
+        '_id': calendar.ids[index],
+        'name': worker.name,
+        'skillset': worker.skillset,
+        'probation': worker.probation
+    }
+
+def parse_date_range_args():
+    """Read date or start/end query parameters as ordinals; raises ValueError on bad input"""
+    start_date = request.args.get('date') or request.args.get('start')
+    end_date = request.args.get('end') or start_date
+    if not start_date:
+        raise ValueError('date, or start and end, are required')
+    try:
+        start, end = parse_date(start_date), parse_date(end_date)
+    except ValueError:
+        raise ValueError('dates must be in dd/mm/YYYY format')
+    if end < start:
+        raise ValueError('end must not be before start')
+    return start_date, end_date, start, end
+
+# GET /api/worker/availability - Workers available / on leave for a date or date range
+@worker_bp.route('/availability', methods=['GET'])
+def get_availability():
+    try:
+        start_date, end_date, start, end = parse_date_range_args()
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid date range: {str(e)}'
+        }), 400
+
+    try:
+        skillset = request.args.get('skillset', '').strip().lower()
+        calendar = load_leave_calendar()
+        on_leave = calendar.on_leave_indexes(start, end)
+
+        candidates = range(len(calendar))
+        if skillset:
+            candidates = [i for i in candidates if skillset in calendar.workers[i].skills]
+
+        available = [serialize_worker(calendar, i) for i in candidates if i not in on_leave]
+        unavailable = [serialize_worker(calendar, i) for i in candidates if i in on_leave]
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'start': start_date,
+                'end': end_date,
+                'available': available,
+                'on_leave': unavailable,
+                'counts': {
+                    'available': len(available),
+                    'on_leave': len(unavailable)
+                }
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error fetching availability',
+            'error': str(e)
+        }), 500
+
+# GET /api/worker/availability/matrix - Workers x days leave grid for roster planning
+@worker_bp.route('/availability/matrix', methods=['GET'])
+def get_availability_matrix():
+    try:
+        start_date = request.args.get('start')
+        if not start_date:
+            raise ValueError('start is required')
+        start = parse_date(start_date)
+        if request.args.get('end'):
+            days = parse_date(request.args['end']) - start + 1
+        else:
+            days = int(request.args.get('days', 90))
+        if not 1 <= days <= MAX_MATRIX_DAYS:
+            raise ValueError(f'the window must be between 1 and {MAX_MATRIX_DAYS} days')
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid date range: {str(e)}'
+        }), 400
+
+    encoding = request.args.get('format', 'rle')
+    if encoding not in ('rle', 'bitset'):
+        return jsonify({
+            'success': False,
+            'message': 'format must be "rle" or "bitset"'
+        }), 400
+
+    probation = request.args.get('probation')
+    if probation is not None:
+        probation = probation.lower() == 'true'
+
+    try:
+        # NumPy is only needed here, so load it on first use
+        from app.utils.availability_matrix import availability_matrix
+        calendar = load_leave_calendar()
+        matrix = availability_matrix(
+            calendar,
+            start,
+            days,
+            skillset=request.args.get('skillset'),
+            probation=probation,
+            encoding=encoding
+        )
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'start': start_date,
+                'days': days,
+                'format': encoding,
+                **matrix
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error building availability matrix',
+            'error': str(e)
+        }), 500
+
+# POST /api/worker/schedule - Assign available workers to shift demand
+@worker_bp.route('/schedule', methods=['POST'])
+def schedule_shifts():
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data.get('demands'), list):
+        return jsonify({
+            'success': False,
+            'message': 'A list of demands is required'
+        }), 400
+
+    if len(data['demands']) > MAX_SHIFT_DEMANDS:
+        return jsonify({
+            'success': False,
+            'message': f'At most {MAX_SHIFT_DEMANDS} demands can be scheduled per request'
+        }), 400
+
+    try:
+        demands = parse_demands(data['demands'])
+    except ShiftDemandError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Validation failed',
+            'errors': [str(e)]
+        }), 400
+
+    try:
+        result = ShiftScheduler(load_leave_calendar()).assign(demands)
+        return jsonify({
+            'success': True,
+            'data': result
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Error scheduling shifts',
+            'error': str(e)
+        }), 500
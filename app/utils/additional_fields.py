@@ -0,0 +1,88 @@
+"""
+Query parameters for filtering and sorting employees on ADDITIONAL_FIELDS.
+
+    additional.<NAME>=value             equality
+    additional.<NAME>.gte=value         range (gt, gte, lt, lte)
+    additional.<NAME>.in=a,b,c          any of the values
+    sort=additional.<NAME>              ascending, or -additional.<NAME> for descending
+
+<NAME> must be an engine name from the current column mapping's
+non_required_columns. Queries are served by the wildcard index on
+ADDITIONAL_FIELDS.$** (see EMPLOYEE_INDEXES).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+
+PARAM_PREFIX = 'additional.'
+FIELD_PREFIX = 'ADDITIONAL_FIELDS.'
+RANGE_OPERATORS = {'gt': '$gt', 'gte': '$gte', 'lt': '$lt', 'lte': '$lte'}
+MAX_IN_VALUES = 100
+
+
+class AdditionalFieldQueryError(ValueError):
+    """Raised when a filter or sort parameter is malformed or names an unknown column."""
+
+
+def parse_value(raw: str) -> Any:
+    """Query strings are text; numeric-looking values are compared as numbers, as Excel stores them"""
+    try:
+        return int(raw)
+    except ValueError:
+        pass
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+def _equality_values(raw: str) -> List[Any]:
+    # Match both the typed value and the text, since a column can hold either
+    value = parse_value(raw)
+    return [value, raw] if value != raw else [raw]
+
+
+def _check_field(name: str, allowed: Iterable[str]) -> str:
+    if name not in allowed:
+        raise AdditionalFieldQueryError(
+            f"Unknown additional field '{name}'. Allowed fields: {', '.join(sorted(allowed)) or 'none'}"
+        )
+    return FIELD_PREFIX + name
+
+
+def parse_additional_filters(args, allowed: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Build a MongoDB filter from `additional.*` request args (a MultiDict)"""
+    allowed = set(allowed)
+    filters: Dict[str, Dict[str, Any]] = {}
+    for key in args:
+        if not key.startswith(PARAM_PREFIX):
+            continue
+        name, _, operator = key[len(PARAM_PREFIX):].partition('.')
+        path = _check_field(name, allowed)
+        condition = filters.setdefault(path, {})
+        for raw in args.getlist(key):
+            if not operator:
+                condition['$in'] = _equality_values(raw)
+            elif operator in RANGE_OPERATORS:
+                condition[RANGE_OPERATORS[operator]] = parse_value(raw)
+            elif operator == 'in':
+                values = [value for part in raw.split(',') if part for value in _equality_values(part)]
+                if not values or len(values) > 2 * MAX_IN_VALUES:
+                    raise AdditionalFieldQueryError(f"{key} takes between 1 and {MAX_IN_VALUES} values")
+                condition['$in'] = values
+            else:
+                raise AdditionalFieldQueryError(
+                    f"Unknown operator '{operator}' in {key}. Use gt, gte, lt, lte or in"
+                )
+    return filters
+
+
+def parse_additional_sort(value: Optional[str], allowed: Iterable[str]) -> Optional[List[Tuple[str, int]]]:
+    """Sort spec for `sort=[-]additional.<NAME>`, with _id as a tiebreaker for stable pages"""
+    if not value:
+        return None
+    direction = DESCENDING if value.startswith('-') else ASCENDING
+    value = value.lstrip('-')
+    if not value.startswith(PARAM_PREFIX):
+        raise AdditionalFieldQueryError("sort must be additional.<NAME> or -additional.<NAME>")
+    return [(_check_field(value[len(PARAM_PREFIX):], set(allowed)), direction), ('_id', direction)]
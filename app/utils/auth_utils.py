@@ -0,0 +1,123 @@
+import datetime
+from functools import wraps
+from typing import Any, Dict, Optional
+
+import jwt
+from bson.errors import InvalidId
+from flask import current_app, g, jsonify, request
+
+from app.config import Config
+from app.models.user import User
+from app.utils.cache_utils import ExpiringLRUCache
+
+# Verified token -> decoded claims, each entry expiring with the token's own `exp`
+_token_cache = ExpiringLRUCache(max_size=Config.AUTH_TOKEN_CACHE_SIZE)
+
+
+def create_access_token(user_id) -> str:
+    """Issue an HS256 access token for the given user id"""
+    return jwt.encode(
+        {
+            'user_id': str(user_id),
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        },
+        current_app.config['SECRET_KEY'],
+        algorithm='HS256'
+    )
+
+
+def get_bearer_token() -> Optional[str]:
+    """Extract the bearer token from the Authorization header, if any"""
+    header = request.headers.get('Authorization', '')
+    scheme, _, token = header.partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
+
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a JWT and return its claims, or None if it is invalid or expired.
+
+    Successful verifications are cached until the token's `exp`, so repeated
+    requests with the same token skip signature checking.
+    """
+    claims = _token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+
+    if 'user_id' not in claims or 'exp' not in claims:
+        return None
+
+    _token_cache.set(token, claims, float(claims['exp']))
+    return claims
+
+
+def load_user_context(token: str) -> Optional[Dict[str, Any]]:
+    """Resolve a token into the authenticated user's context (without the password hash)"""
+    claims = verify_token(token)
+    if claims is None:
+        return None
+
+    try:
+        user = User.get_cached(claims['user_id'])
+    except InvalidId:
+        return None
+    if not user:
+        return None
+
+    context = {k: v for k, v in user.items() if k != 'password'}
+    context['_id'] = str(context['_id'])
+    return context
+
+
+def authenticate_request():
+    """
+    Blueprint `before_request` hook.
+
+    Populates `g.current_user` when a valid bearer token is sent. Requests
+    without a token pass through unless `AUTH_REQUIRED` is enabled.
+    """
+    g.current_user = None
+    if request.method == 'OPTIONS':
+        # CORS preflights never carry credentials
+        return None
+
+    token = get_bearer_token()
+
+    if token is None:
+        if current_app.config.get('AUTH_REQUIRED'):
+            return _unauthorized('Authentication required')
+        return None
+
+    g.current_user = load_user_context(token)
+    if g.current_user is None:
+        return _unauthorized('Invalid or expired token')
+    return None
+
+
+def token_required(view):
+    """Decorator that rejects the request unless it carries a valid bearer token"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if getattr(g, 'current_user', None) is None:
+            token = get_bearer_token()
+            if token is None:
+                return _unauthorized('Authentication required')
+            g.current_user = load_user_context(token)
+            if g.current_user is None:
+                return _unauthorized('Invalid or expired token')
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _unauthorized(message):
+    return jsonify({
+        'success': False,
+        'message': message
+    }), 401
@@ -0,0 +1,118 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.utils.leave_calendar import LeaveCalendar
+
+
+def select_workers(calendar: LeaveCalendar, skillset: Optional[str] = None, probation: Optional[bool] = None) -> np.ndarray:
+    """Indexes of calendar workers matching the skillset / probation filters."""
+    skillset = (skillset or '').strip().lower()
+    return np.array([
+        index for index, worker in enumerate(calendar.workers)
+        if (not skillset or skillset in worker.skills)
+        and (probation is None or bool(worker.probation) == probation)
+    ], dtype=np.int64)
+
+
+def _interval_array(calendar: LeaveCalendar) -> np.ndarray:
+    """(start, end, worker_index) rows as an int64 array, converted once per calendar."""
+    array = getattr(calendar, '_interval_array', None)
+    if array is None:
+        array = np.asarray(calendar.intervals, dtype=np.int64).reshape(-1, 3)
+        calendar._interval_array = array
+    return array
+
+
+def leave_matrix(calendar: LeaveCalendar, start: int, days: int, worker_indexes: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Boolean workers x days matrix, True where the worker is on leave.
+
+    Each leave interval clipped to the window adds +1 at its first day and -1
+    after its last day in a difference array; a cumulative sum along the day
+    axis then fills the whole grid without per-day or per-worker loops.
+
+    Args:
+        calendar: Workforce leave calendar
+        start: First day of the window, as a date ordinal
+        days: Number of days in the window
+        worker_indexes: Calendar indexes to include, in output row order (default: all)
+    """
+    if worker_indexes is None:
+        worker_indexes = np.arange(len(calendar))
+    worker_indexes = np.asarray(worker_indexes, dtype=np.int64)
+
+    width = days + 1
+    size = len(worker_indexes) * width
+    diff = np.zeros(size, dtype=np.int64)
+    if calendar.intervals and len(worker_indexes):
+        intervals = _interval_array(calendar)
+        starts, ends, owners = intervals[:, 0], intervals[:, 1], intervals[:, 2]
+
+        # Map calendar worker index -> output row, dropping workers that were filtered out
+        row_of = np.full(len(calendar), -1, dtype=np.int64)
+        row_of[worker_indexes] = np.arange(len(worker_indexes))
+        rows = row_of[owners]
+
+        first = np.maximum(starts, start) - start
+        last = np.minimum(ends, start + days - 1) - start
+        keep = (rows >= 0) & (first <= last)
+
+        rows, first, last = rows[keep], first[keep], last[keep]
+        diff = (np.bincount(rows * width + first, minlength=size)
+                - np.bincount(rows * width + last + 1, minlength=size))
+
+    diff = diff.reshape(len(worker_indexes), width)
+    return np.cumsum(diff[:, :days], axis=1) > 0
+
+
+def encode_bitsets(matrix: np.ndarray) -> List[str]:
+    """Hex bitset per row; bit i (most significant bit first) is day i."""
+    if matrix.shape[0] == 0:
+        return []
+    packed = np.packbits(matrix, axis=1)
+    width = packed.shape[1] * 2
+    hex_string = packed.tobytes().hex()
+    return [hex_string[i:i + width] for i in range(0, len(hex_string), width)]
+
+
+def encode_runs(matrix: np.ndarray) -> List[List[List[int]]]:
+    """Run-length encoding per row: [[first_day_offset, length], ...] for each leave run."""
+    padded = np.zeros((matrix.shape[0], matrix.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix
+    edges = np.diff(padded, axis=1)
+    run_rows, run_starts = np.nonzero(edges == 1)
+    _, run_ends = np.nonzero(edges == -1)  # row-major order pairs each start with its end
+
+    runs = [[] for _ in range(matrix.shape[0])]
+    for row, run_start, run_end in zip(run_rows.tolist(), run_starts.tolist(), run_ends.tolist()):
+        runs[row].append([run_start, run_end - run_start])
+    return runs
+
+
+def availability_matrix(calendar: LeaveCalendar, start: int, days: int, skillset: Optional[str] = None,
+                        probation: Optional[bool] = None, encoding: str = 'rle') -> Dict[str, Any]:
+    """
+    Compute the workers x days leave grid for a window and return it in compact form.
+
+    Returns:
+        Dictionary with one entry per selected worker (`leave` is a hex bitset or
+        run list, per `encoding`) and the number of available workers per day
+    """
+    indexes = select_workers(calendar, skillset, probation)
+    matrix = leave_matrix(calendar, start, days, indexes)
+    leave = encode_bitsets(matrix) if encoding == 'bitset' else encode_runs(matrix)
+
+    return {
+        'workers': [
+            {
+                '_id': calendar.ids[index],
+                'name': calendar.workers[index].name,
+                'skillset': calendar.workers[index].skillset,
+                'probation': calendar.workers[index].probation,
+                'leave': leave[row]
+            }
+            for row, index in enumerate(indexes.tolist())
+        ],
+        'available_per_day': (len(indexes) - matrix.sum(axis=0)).tolist()
+    }
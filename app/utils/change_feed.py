@@ -0,0 +1,167 @@
+"""
+Employee change feed, delivered as server-sent events.
+
+By default events come from the in-process EventBus, published by the
+employee and upload routes. With EMPLOYEE_CHANGE_STREAM enabled (MongoDB
+replica set required) each subscriber watches the employee collection
+instead, so it sees writes from every worker and resumes from the change
+stream's own resume token.
+
+Every open stream holds a worker thread for up to EVENT_STREAM_MAX_SECONDS,
+so each worker serves at most EVENT_STREAM_MAX_CONCURRENT of them at once
+(see `open_stream_slot`). For many more subscribers, serve this route from
+an async worker class (gevent/eventlet) instead of raising the limit.
+"""
+import json
+import logging
+import threading
+import time
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.config import Config
+from app.utils.event_bus import EventBus
+
+logger = logging.getLogger(__name__)
+
+employee_events = EventBus(Config.EVENT_BUS_BUFFER_SIZE)
+
+# Clients wait this long before reconnecting after a stream closes
+RECONNECT_MILLISECONDS = 3000
+
+CHANGE_STREAM_EVENT_TYPES = {
+    'insert': 'employee.created',
+    'update': 'employee.updated',
+    'replace': 'employee.updated',
+    'delete': 'employee.deleted',
+}
+
+
+_active_streams = 0
+_streams_lock = threading.Lock()
+
+
+class _StreamSlot:
+    """Iterates an event stream and frees its slot when the response is closed, even if never iterated"""
+
+    def __init__(self, events):
+        self._events = events
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        global _active_streams
+        if self._released:
+            return
+        self._released = True
+        with _streams_lock:
+            _active_streams -= 1
+        if hasattr(self._events, 'close'):
+            self._events.close()
+
+
+def open_stream_slot(events):
+    """
+    Reserve one of this worker's EVENT_STREAM_MAX_CONCURRENT stream slots for `events`.
+
+    Returns an iterable that releases the slot when closed, or None when every slot is taken.
+    """
+    global _active_streams
+    with _streams_lock:
+        if _active_streams >= Config.EVENT_STREAM_MAX_CONCURRENT:
+            return None
+        _active_streams += 1
+    return _StreamSlot(events)
+
+
+def publish_employee_change(event_type, data):
+    """Publish an employee change to subscribers of this process"""
+    return employee_events.publish(event_type, data)
+
+
+def format_sse(event_type, data, event_id=None):
+    """Encode one server-sent event"""
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def _reset_event(event_id=None):
+    # The client missed events it cannot replay; it should refetch and continue from here
+    return format_sse('reset', {'reason': 'Missed events cannot be replayed; refetch current data'}, event_id)
+
+
+def memory_event_stream(last_event_id=None, heartbeat_seconds=None, max_seconds=None):
+    """Yield SSE frames from the in-process bus, resuming after `last_event_id` when possible"""
+    heartbeat_seconds = heartbeat_seconds or Config.EVENT_STREAM_HEARTBEAT_SECONDS
+    deadline = time.monotonic() + (max_seconds or Config.EVENT_STREAM_MAX_SECONDS)
+
+    yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+    cursor = employee_events.resume_seq(last_event_id)
+    if cursor is None:
+        cursor = employee_events.last_seq
+        yield _reset_event(employee_events.event_id(cursor))
+
+    while time.monotonic() < deadline:
+        events = employee_events.wait(cursor, min(heartbeat_seconds, max(deadline - time.monotonic(), 0)))
+        if events is None:
+            cursor = employee_events.last_seq
+            yield _reset_event(employee_events.event_id(cursor))
+        elif not events:
+            yield ": keep-alive\n\n"
+        else:
+            for event in events:
+                yield format_sse(event['type'], event['data'], event['id'])
+                cursor = event['seq']
+
+
+def _change_event(change):
+    document_id = str(change['documentKey']['_id'])
+    if change['operationType'] == 'delete':
+        return {'_id': document_id}
+    data = {'_id': document_id, 'data': change.get('fullDocument')}
+    if change['operationType'] == 'update':
+        description = change.get('updateDescription', {})
+        data['changes'] = description.get('updatedFields', {})
+        data['removed'] = description.get('removedFields', [])
+    return data
+
+
+def change_stream_events(collection, last_event_id=None, heartbeat_seconds=None, max_seconds=None):
+    """Yield SSE frames from a MongoDB change stream; event ids are resume tokens"""
+    heartbeat_seconds = heartbeat_seconds or Config.EVENT_STREAM_HEARTBEAT_SECONDS
+    deadline = time.monotonic() + (max_seconds or Config.EVENT_STREAM_MAX_SECONDS)
+    pipeline = [{'$match': {'operationType': {'$in': list(CHANGE_STREAM_EVENT_TYPES)}}}]
+    options = {'full_document': 'updateLookup', 'max_await_time_ms': int(heartbeat_seconds * 1000)}
+
+    yield f"retry: {RECONNECT_MILLISECONDS}\n\n"
+    try:
+        stream = collection.watch(pipeline, resume_after={'_data': last_event_id} if last_event_id else None, **options)
+    except OperationFailure as e:
+        # Unknown or expired resume token
+        logger.info(f"Cannot resume employee change stream: {str(e)}")
+        stream = collection.watch(pipeline, **options)
+        yield _reset_event()
+
+    try:
+        with stream:
+            while time.monotonic() < deadline and stream.alive:
+                change = stream.try_next()
+                if change is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(
+                    CHANGE_STREAM_EVENT_TYPES[change['operationType']],
+                    _change_event(change),
+                    change['_id']['_data']
+                )
+    except PyMongoError as e:
+        logger.error(f"Employee change stream failed: {str(e)}")
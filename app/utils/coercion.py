@@ -0,0 +1,192 @@
+"""
+Canonical forms for employee fields, shared by Excel ingest and the employee routes.
+
+Upserts match employees on EMAIL_ADDRESS and PHONE_NUMBER, so both paths
+must store them identically: emails trimmed and lowercased, phone numbers
+as int (Excel hands them over as floats like 91234567.0). Other columns
+are cast per their COLUMN_VALIDATION_CONFIG type. Values that cannot be
+coerced are left unchanged so validation can report them.
+
+`coerce_frame` works on whole DataFrame columns for ingest; `coerce_record`
+applies the same rules to a single document. pandas is imported on first
+use, so the routes can use this module without loading it.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.validation_utils import COLUMN_VALIDATION_CONFIG
+
+TRUE_STRINGS = {'yes', 'y', 'true'}
+FALSE_STRINGS = {'no', 'n', 'false'}
+
+
+def _is_missing(value: Any) -> bool:
+    # NaN is the only value not equal to itself
+    return value is None or value != value
+
+
+def normalize_email(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def normalize_integer(value: Any) -> Any:
+    number = _to_number(value)
+    if number is None or _is_missing(number) or number % 1:
+        return value
+    return int(number)
+
+
+def normalize_phone(value: Any) -> Any:
+    # Phone numbers are stored as int; strings like "9123 4567" lose their spaces first
+    if isinstance(value, str):
+        value = ''.join(value.split())
+    return normalize_integer(value)
+
+
+def normalize_float(value: Any) -> Any:
+    number = _to_number(value)
+    return value if number is None else float(number)
+
+
+def normalize_string(value: Any) -> Any:
+    return value.strip() if isinstance(value, str) else value
+
+
+def normalize_boolean_string(value: Any, valid_values: List[str]) -> Any:
+    yes, no = (valid_values + [None, None])[:2]
+    if isinstance(value, bool):
+        return yes if value else no
+    if isinstance(value, str):
+        text = value.strip().lower()
+        for valid in valid_values:
+            if text == valid.lower():
+                return valid
+        if text in TRUE_STRINGS:
+            return yes
+        if text in FALSE_STRINGS:
+            return no
+    return value
+
+
+def _scalar_coercer(rule: Dict[str, Any]):
+    field_type = rule['type']
+    if field_type == 'email':
+        return normalize_email
+    if field_type == 'phone':
+        return normalize_phone
+    if field_type == 'integer':
+        return normalize_integer
+    if field_type == 'float':
+        return normalize_float
+    if field_type == 'boolean_string':
+        valid_values = rule.get('valid_values', ['Yes', 'No'])
+        return lambda value: normalize_boolean_string(value, valid_values)
+    if field_type == 'string':
+        return normalize_string
+    return None
+
+
+def coerce_record(data: Dict[str, Any], rules: List[Dict] = COLUMN_VALIDATION_CONFIG) -> Dict[str, Any]:
+    """Return a copy of `data` with every configured field in its canonical form"""
+    coerced = dict(data)
+    for rule in rules:
+        coercer = _scalar_coercer(rule)
+        field_name = rule['label']
+        if coercer and field_name in coerced and not _is_missing(coerced[field_name]):
+            coerced[field_name] = coercer(coerced[field_name])
+    return coerced
+
+
+def employee_key(document: Dict[str, Any]) -> Tuple[Any, Any]:
+    """The (EMAIL_ADDRESS, PHONE_NUMBER) pair upserts match on, in canonical form"""
+    return normalize_email(document.get('EMAIL_ADDRESS')), normalize_phone(document.get('PHONE_NUMBER'))
+
+
+def _coerce_numeric_column(series, integral: bool):
+    import pandas as pd
+
+    text = series.astype(str).str.replace(r'\s+', '', regex=True) if series.dtype == object else series
+    numbers = pd.to_numeric(text, errors='coerce')
+    ok = numbers.notna() & ~series.map(lambda value: isinstance(value, bool))
+    if integral:
+        ok &= (numbers % 1) == 0
+        # object dtype keeps Python ints (BSON cannot encode numpy scalars) next to missing cells
+        converted = numbers[ok].astype('int64').astype(object)
+    else:
+        converted = numbers[ok].astype(float).astype(object)
+    result = series.astype(object)
+    result[ok] = converted
+    return result
+
+
+def _coerce_text_column(series, lower: bool = False):
+    is_text = series.map(lambda value: isinstance(value, str))
+    if not is_text.any():
+        return series
+    text = series[is_text].str.strip()
+    result = series.astype(object)
+    result[is_text] = text.str.lower() if lower else text
+    return result
+
+
+def _coerce_boolean_column(series, valid_values: List[str]):
+    lookup = {}
+    yes, no = (valid_values + [None, None])[:2]
+    for text in TRUE_STRINGS:
+        lookup[text] = yes
+    for text in FALSE_STRINGS:
+        lookup[text] = no
+    lookup.update({valid.lower(): valid for valid in valid_values})
+
+    result = series.astype(object)
+    is_text = series.map(lambda value: isinstance(value, str))
+    if is_text.any():
+        mapped = series[is_text].str.strip().str.lower().map(lookup)
+        result[is_text] = mapped.where(mapped.notna(), series[is_text])
+    is_bool = series.map(lambda value: isinstance(value, bool))
+    if is_bool.any():
+        result[is_bool] = series[is_bool].map({True: yes, False: no})
+    return result
+
+
+def coerce_frame(df, rules: List[Dict] = COLUMN_VALIDATION_CONFIG):
+    """
+    Cast every configured column of `df` to its canonical form, a column at a time.
+
+    Columns are matched on engine names, so run this after ColumnPlan.apply.
+    Returns a new DataFrame; unconfigured columns are passed through.
+    """
+    columns = {}
+    for rule in rules:
+        field_name = rule['label']
+        if field_name not in df.columns:
+            continue
+        series = df[field_name]
+        field_type = rule['type']
+        if field_type == 'email':
+            columns[field_name] = _coerce_text_column(series, lower=True)
+        elif field_type in ('phone', 'integer'):
+            columns[field_name] = _coerce_numeric_column(series, integral=True)
+        elif field_type == 'float':
+            columns[field_name] = _coerce_numeric_column(series, integral=False)
+        elif field_type == 'boolean_string':
+            columns[field_name] = _coerce_boolean_column(series, rule.get('valid_values', ['Yes', 'No']))
+        elif field_type == 'string':
+            columns[field_name] = _coerce_text_column(series)
+    if not columns:
+        return df
+    return df.assign(**columns)
@@ -0,0 +1,117 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import Config
+from app.models.column_mapping import ColumnMapping
+from app.models.error_response import ErrorResponse
+from app.utils.cache_utils import ExpiringLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Compiled plans keyed by (mapping uuid, version); a new version is a new key, so entries never go stale
+_plan_cache = ExpiringLRUCache(max_size=64)
+
+
+def engine_name_for(header) -> str:
+    """Default engine name for a header with no stored label: upper snake case"""
+    return str(header).strip().upper().replace(' ', '_')
+
+
+class ColumnPlan:
+    """
+    Rename-and-route plan compiled from a column mapping.
+
+    Each sheet header is resolved once to its engine name (a stored label, or
+    the upper snake case default) and to whether it is a top-level mandatory
+    column or belongs in ADDITIONAL_FIELDS, so rows are never inspected cell
+    by cell to decide where a value goes.
+    """
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None, required: Optional[Set[str]] = None,
+                 mapping_uuid: Optional[str] = None, version=None):
+        self.labels = labels or {}
+        self.required = set(required or ())
+        self.mapping_uuid = mapping_uuid
+        self.version = version
+
+    @classmethod
+    def from_mapping(cls, mapping: Optional[Dict]) -> 'ColumnPlan':
+        """Compile a stored mapping document; None gives the default plan"""
+        if not mapping:
+            return cls()
+        labels, required = {}, set()
+        for key, is_required in (('non_required_columns', False), ('required_columns', True)):
+            for engine_name, column in (mapping.get(key) or {}).items():
+                engine_name = column.get('engine_name') or engine_name
+                label = str(column.get('label') or '').strip().lower()
+                if label:
+                    labels[label] = engine_name
+                if is_required:
+                    required.add(engine_name)
+        return cls(labels, required, mapping.get('uuid'), mapping.get('version'))
+
+    def resolve(self, header) -> Tuple[str, bool]:
+        """(engine_name, mandatory) for one sheet header"""
+        engine_name = self.labels.get(str(header).strip().lower()) or engine_name_for(header)
+        mandatory = engine_name in self.required or engine_name.lower() in Config.MANDATORY_COLUMNS
+        return engine_name, mandatory
+
+    def column_labels(self, headers: Iterable) -> Dict[str, str]:
+        """engine_name -> original header label, in sheet order"""
+        return {self.resolve(header)[0]: str(header) for header in headers}
+
+    def apply(self, df) -> Tuple[object, List[bool]]:
+        """
+        Rename a DataFrame's columns to engine names.
+
+        Returns:
+            The renamed DataFrame and a per-column flag, True for mandatory columns
+        """
+        resolved = [self.resolve(header) for header in df.columns]
+        names = [engine_name for engine_name, _ in resolved]
+        if len(set(names)) != len(names):
+            duplicates = sorted({name for name in names if names.count(name) > 1})
+            raise ErrorResponse(
+                title="Validation Error",
+                status=400,
+                detail=f"Columns map to the same field: {', '.join(duplicates)}",
+                errors="Duplicate columns found in Excel file"
+            )
+        renamed = df.set_axis(names, axis=1, copy=False)
+        return renamed, [mandatory for _, mandatory in resolved]
+
+
+def compile_column_plan(mapping: Optional[Dict]) -> ColumnPlan:
+    """Compile a mapping document into a ColumnPlan, reusing the cached plan for its uuid and version"""
+    if not mapping or not mapping.get('uuid'):
+        return ColumnPlan.from_mapping(mapping)
+    key = (mapping['uuid'], str(mapping.get('version')))
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = ColumnPlan.from_mapping(mapping)
+        _plan_cache.set(key, plan, float('inf'))
+    return plan
+
+
+def column_plan_for(headers) -> ColumnPlan:
+    """
+    Plan for the mapping registered for this workbook's header layout.
+
+    The layout is looked up by the fingerprint of its default engine names,
+    then by a mapping whose (possibly edited) labels are exactly these
+    headers. An unknown layout gets the default plan, so edits made to one
+    layout's mapping never apply to another's.
+    """
+    try:
+        fingerprint = ColumnMapping.fingerprint([engine_name_for(header) for header in headers])
+        mapping = (ColumnMapping.get_by_fingerprint(fingerprint)
+                   or ColumnMapping.get_by_label_fingerprint(ColumnMapping.label_fingerprint(headers)))
+        return compile_column_plan(mapping)
+    except Exception as e:
+        logger.error(f"Error loading column mapping: {str(e)}")
+        raise ErrorResponse(
+            title="Database Error",
+            status=500,
+            detail="Failed to load the column mapping for this file.",
+            errors=str(e)
+        )
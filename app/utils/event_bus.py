@@ -0,0 +1,85 @@
+"""
+In-process event bus for change feeds.
+
+Events get increasing sequence ids and are kept in a bounded ring buffer,
+so a subscriber that reconnects with its last seen id gets everything it
+missed as long as the buffer still holds it. Ids are prefixed with a
+per-process instance id: an id from another process (or from before a
+restart) cannot be resumed, and the subscriber is told to reset instead.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class EventBus:
+    def __init__(self, capacity: int = 1000):
+        self._capacity = capacity
+        self.reset()
+
+    def reset(self):
+        """Start over with a new instance id and an empty buffer, e.g. in a freshly forked worker"""
+        self.instance = uuid.uuid4().hex[:12]
+        self._events = deque(maxlen=self._capacity)
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.instance}:{seq}"
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Append an event and wake every waiting subscriber"""
+        with self._condition:
+            self._seq += 1
+            event = {
+                'seq': self._seq,
+                'id': self.event_id(self._seq),
+                'type': event_type,
+                'time': time.time(),
+                'data': data
+            }
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def resume_seq(self, last_event_id: Optional[str]) -> Optional[int]:
+        """
+        Sequence number to resume after, from a client's last event id.
+
+        Returns None when the id belongs to another process or has already
+        left the buffer, meaning events were missed and the client must reset.
+        """
+        if not last_event_id:
+            return self._seq
+        instance, _, seq = last_event_id.partition(':')
+        if instance != self.instance or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._condition:
+            oldest = self._events[0]['seq'] if self._events else self._seq + 1
+            if seq > self._seq or seq < oldest - 1:
+                return None
+        return seq
+
+    def wait(self, after_seq: int, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Events published after `after_seq`, waiting up to `timeout` seconds for one.
+
+        Returns an empty list on timeout, or None if some of those events
+        were already evicted from the buffer.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > after_seq, timeout)
+            if self._seq <= after_seq:
+                return []
+            if self._events[0]['seq'] > after_seq + 1:
+                return None
+            # Events are contiguous, so the first wanted one sits at a known offset
+            start = after_seq + 1 - self._events[0]['seq']
+            return [self._events[i] for i in range(start, len(self._events))]
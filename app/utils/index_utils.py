@@ -0,0 +1,38 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_ensured = set()
+_lock = threading.Lock()
+
+
+def ensure_indexes(collection, indexes):
+    """
+    Create the given indexes on a collection once per process.
+
+    Args:
+        collection: pymongo Collection
+        indexes: List of (keys, options) tuples, as passed to `create_index`
+    """
+    key = (collection.database.name, collection.name)
+    if key in _ensured:
+        return
+
+    with _lock:
+        if key in _ensured:
+            return
+        for keys, options in indexes:
+            collection.create_index(keys, **options)
+        _ensured.add(key)
+        logger.info(f"Ensured indexes on {collection.full_name}")
+
+
+def reset_ensured_indexes(collection_name=None):
+    """Forget which collections have been indexed, e.g. after a collection is dropped or swapped."""
+    with _lock:
+        if collection_name is None:
+            _ensured.clear()
+        else:
+            for key in [k for k in _ensured if k[1] == collection_name]:
+                _ensured.discard(key)
@@ -0,0 +1,220 @@
+"""
+Ingest admission control and write pacing.
+
+Every worker process shares the same pool of INGEST_MAX_CONCURRENT slots,
+stored as documents in the `ingest_slots` collection. A slot is taken by
+upserting it with a filter that only matches when it is free or its lease has
+expired; if another ingest holds it, the upsert collides with the existing
+`_id` and fails with DuplicateKeyError. Leases expire on their own, so a
+crashed worker cannot hold a slot forever.
+
+While it holds a slot, an ingest paces its upsert batches to its share of
+INGEST_WRITE_BUDGET_OPS: the budget is divided by the number of live leases,
+so the combined write rate stays within budget however many ingests run.
+
+A full-refresh (replace) ingest takes every slot with `exclusive_ingest`, so
+it waits for running upserts and no new ingest starts until it is done;
+the employee write routes check `replace_in_progress` and refuse writes
+that the collection swap would otherwise silently discard.
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from app import mongo
+from app.config import Config
+from app.models.error_response import ErrorResponse
+from app.utils.metrics import INGEST_REJECTED, INGEST_THROTTLE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Poll interval bounds while queued for a slot
+MIN_POLL_SECONDS = 0.25
+MAX_POLL_SECONDS = 2.0
+
+
+@dataclass
+class IngestBusyError(ErrorResponse):
+    """All ingest slots are taken; the response carries a Retry-After header."""
+    retry_after: int = 0
+
+    def to_response(self):
+        response, status = super().to_response()
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response, status
+
+
+class IngestLease:
+    """A held ingest slot. Call `pace(ops)` after each write batch."""
+
+    def __init__(self, slot_id=None, holder=None):
+        self.slot_id = slot_id
+        self.holder = holder
+        self._batch_started = time.monotonic()
+
+    def _now(self):
+        return datetime.now(timezone.utc)
+
+    def _renew(self):
+        if self.slot_id is None:
+            return
+        # Covers the extra slots taken by exclusive_ingest as well
+        mongo.db.ingest_slots.update_many(
+            {'holder': self.holder},
+            {'$set': {'expires_at': self._now() + timedelta(seconds=Config.INGEST_LEASE_SECONDS)}}
+        )
+
+    def _write_rate(self):
+        """This ingest's share of the write budget, in ops/sec (0 = unpaced)"""
+        budget = Config.INGEST_WRITE_BUDGET_OPS
+        if budget <= 0:
+            return 0
+        active = 1
+        if self.slot_id is not None:
+            # Count ingests, not slots: an exclusive ingest holds them all
+            active = max(len(mongo.db.ingest_slots.distinct('holder', {'expires_at': {'$gt': self._now()}})), 1)
+        return budget / active
+
+    def pace(self, ops):
+        """Account for `ops` writes just issued, sleeping if this ingest is ahead of its budget"""
+        self._renew()
+        rate = self._write_rate()
+        if rate <= 0:
+            self._batch_started = time.monotonic()
+            return
+        # Each batch takes at least ops / rate seconds, measured from the end of the previous one
+        delay = self._batch_started + ops / rate - time.monotonic()
+        if delay > 0:
+            INGEST_THROTTLE_SECONDS.inc(delay)
+            time.sleep(delay)
+        self._batch_started = time.monotonic()
+
+    def release(self):
+        if self.slot_id is not None:
+            mongo.db.ingest_slots.delete_one({'_id': self.slot_id, 'holder': self.holder})
+
+
+def _take_slot(slot_id, holder, exclusive=False):
+    """Take one slot if it is free or its lease expired; returns True on success"""
+    now = datetime.now(timezone.utc)
+    try:
+        mongo.db.ingest_slots.find_one_and_update(
+            {'_id': slot_id, 'expires_at': {'$lt': now}},
+            {'$set': {
+                'holder': holder,
+                'exclusive': exclusive,
+                'acquired_at': now,
+                'expires_at': now + timedelta(seconds=Config.INGEST_LEASE_SECONDS)
+            }},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def _try_acquire(holder):
+    """Take the first free slot; returns its id, or None if all are held"""
+    for slot in range(Config.INGEST_MAX_CONCURRENT):
+        slot_id = f"slot-{slot}"
+        if _take_slot(slot_id, holder):
+            return slot_id
+    return None
+
+
+def _busy_error(detail, errors):
+    INGEST_REJECTED.inc()
+    return IngestBusyError(
+        title="Too Many Requests",
+        status=429,
+        detail=detail,
+        error_type="ingest-busy",
+        errors=errors,
+        retry_after=Config.INGEST_RETRY_AFTER_SECONDS
+    )
+
+
+@contextmanager
+def ingest_slot(timeout=None):
+    """
+    Hold an ingest slot for the duration of the block, yielding an IngestLease.
+
+    Waits up to `timeout` seconds (default INGEST_QUEUE_TIMEOUT_SECONDS) for a
+    slot, then raises IngestBusyError. With INGEST_MAX_CONCURRENT set to 0 no
+    slot is taken, but writes are still paced to the budget.
+    """
+    if Config.INGEST_MAX_CONCURRENT <= 0:
+        yield IngestLease()
+        return
+
+    timeout = Config.INGEST_QUEUE_TIMEOUT_SECONDS if timeout is None else timeout
+    holder = uuid.uuid4().hex
+    deadline = time.monotonic() + timeout
+    poll = MIN_POLL_SECONDS
+    slot_id = _try_acquire(holder)
+    while slot_id is None and time.monotonic() < deadline:
+        time.sleep(min(poll, max(deadline - time.monotonic(), 0)))
+        poll = min(poll * 2, MAX_POLL_SECONDS)
+        slot_id = _try_acquire(holder)
+
+    if slot_id is None:
+        raise _busy_error("Too many uploads are being processed. Please retry later.", "All ingest slots are in use")
+
+    lease = IngestLease(slot_id, holder)
+    logger.info(f"Acquired ingest {slot_id}")
+    try:
+        yield lease
+    finally:
+        lease.release()
+
+
+@contextmanager
+def exclusive_ingest(lease, timeout=None):
+    """
+    Extend `lease` to every ingest slot for the duration of the block.
+
+    Waits up to `timeout` seconds (default INGEST_QUEUE_TIMEOUT_SECONDS) for
+    running ingests to release their slots, then raises IngestBusyError. While
+    held, `replace_in_progress()` is true. Without slots (INGEST_MAX_CONCURRENT
+    of 0) nothing is coordinated.
+    """
+    if lease.slot_id is None:
+        yield lease
+        return
+
+    timeout = Config.INGEST_QUEUE_TIMEOUT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    poll = MIN_POLL_SECONDS
+    wanted = [f"slot-{slot}" for slot in range(Config.INGEST_MAX_CONCURRENT) if f"slot-{slot}" != lease.slot_id]
+    try:
+        while True:
+            wanted = [slot_id for slot_id in wanted if not _take_slot(slot_id, lease.holder, exclusive=True)]
+            if not wanted or time.monotonic() >= deadline:
+                break
+            time.sleep(min(poll, max(deadline - time.monotonic(), 0)))
+            poll = min(poll * 2, MAX_POLL_SECONDS)
+        if wanted:
+            raise _busy_error(
+                "A full refresh waits for running uploads to finish. Please retry later.",
+                "Other ingests are still running"
+            )
+
+        mongo.db.ingest_slots.update_one({'_id': lease.slot_id, 'holder': lease.holder}, {'$set': {'exclusive': True}})
+        logger.info("Holding every ingest slot for an exclusive ingest")
+        yield lease
+    finally:
+        mongo.db.ingest_slots.delete_many({'holder': lease.holder, '_id': {'$ne': lease.slot_id}})
+        mongo.db.ingest_slots.update_one({'_id': lease.slot_id, 'holder': lease.holder}, {'$set': {'exclusive': False}})
+
+
+def replace_in_progress():
+    """True while an exclusive (full-refresh) ingest holds the slots"""
+    return mongo.db.ingest_slots.find_one(
+        {'exclusive': True, 'expires_at': {'$gt': datetime.now(timezone.utc)}},
+        {'_id': 1}
+    ) is not None
@@ -0,0 +1,93 @@
+from typing import Iterable, List, Optional, Set, Tuple
+
+from app.models.worker import Worker, parse_date
+
+
+class _IntervalNode:
+    """Node of a static centered interval tree over (start, end, worker_index) triples."""
+
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, intervals: List[Tuple[int, int, int]]):
+        endpoints = sorted(point for start, end, _ in intervals for point in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        # Intervals containing the center, sorted both ways for early exit
+        self.by_start = sorted(here, key=lambda i: i[0])
+        self.by_end = sorted(here, key=lambda i: i[1], reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+    def overlapping(self, start: int, end: int, found: Set[int]) -> None:
+        """Collect worker indexes whose intervals overlap the inclusive range [start, end]."""
+        node = self
+        while node is not None:
+            if end < node.center:
+                for interval in node.by_start:
+                    if interval[0] > end:
+                        break
+                    found.add(interval[2])
+                node = node.left
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] < start:
+                        break
+                    found.add(interval[2])
+                node = node.right
+            else:
+                # The range spans the center, so every interval here overlaps it
+                found.update(interval[2] for interval in node.by_start)
+                if node.left is not None:
+                    node.left.overlapping(start, end, found)
+                node = node.right
+
+
+class LeaveCalendar:
+    """
+    Workforce-level leave index.
+
+    Every worker's merged leave intervals go into one interval tree, so
+    "who is on leave / available on date X or between X and Y" takes
+    O(log n + k) time instead of checking each worker's leave.
+    """
+
+    def __init__(self, workers: Iterable[Worker], ids: Optional[List[str]] = None):
+        self.workers = list(workers)
+        self.ids = ids if ids is not None else [None] * len(self.workers)
+        self.intervals = [
+            (start, end, index)
+            for index, worker in enumerate(self.workers)
+            for start, end in worker.leave_intervals
+        ]
+        self._root = _IntervalNode(self.intervals) if self.intervals else None
+
+    def __len__(self):
+        return len(self.workers)
+
+    def on_leave_indexes(self, start: int, end: Optional[int] = None) -> Set[int]:
+        """Indexes of workers with leave overlapping the ordinal date (or inclusive range)."""
+        found = set()
+        if self._root is not None:
+            self._root.overlapping(start, start if end is None else end, found)
+        return found
+
+    def on_leave(self, start_date: str, end_date: Optional[str] = None) -> List[Worker]:
+        """Workers on leave on a date, or at any point in an inclusive date range."""
+        end = parse_date(end_date) if end_date else None
+        indexes = self.on_leave_indexes(parse_date(start_date), end)
+        return [self.workers[i] for i in sorted(indexes)]
+
+    def available(self, start_date: str, end_date: Optional[str] = None) -> List[Worker]:
+        """Workers with no leave on a date, or for the whole of an inclusive date range."""
+        end = parse_date(end_date) if end_date else None
+        indexes = self.on_leave_indexes(parse_date(start_date), end)
+        return [worker for i, worker in enumerate(self.workers) if i not in indexes]
@@ -0,0 +1,85 @@
+"""
+Prometheus metrics.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty, writable directory
+before the workers start. Each worker then writes its samples there, and
+/metrics aggregates across all of them.
+"""
+import os
+import time
+
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route',
+    ['blueprint', 'endpoint', 'method'],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_COUNT = Counter(
+    'http_requests_total',
+    'HTTP requests by route and status code',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+MONGO_COMMAND_DURATION = Histogram(
+    'mongo_command_duration_seconds',
+    'MongoDB command duration by collection and command',
+    ['collection', 'command'],
+    buckets=LATENCY_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    'mongo_command_failures_total',
+    'Failed MongoDB commands by collection and command',
+    ['collection', 'command']
+)
+INGEST_ROWS_PARSED = Counter('ingest_rows_parsed_total', 'Rows parsed from uploaded workbooks')
+INGEST_ROWS_UPSERTED = Counter('ingest_rows_upserted_total', 'Rows inserted or updated by ingest')
+INGEST_BYTES_READ = Counter('ingest_bytes_read_total', 'Bytes of uploaded workbooks read')
+INGEST_REJECTED = Counter('ingest_rejected_total', 'Uploads turned away because every ingest slot was taken')
+INGEST_THROTTLE_SECONDS = Counter('ingest_throttle_seconds_total', 'Seconds ingest spent waiting on the write budget')
+
+
+def _route_labels():
+    # Use the URL rule rather than the path so label cardinality stays bounded
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    return request.blueprint or '', rule, request.method
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        blueprint, endpoint, method = _route_labels()
+        REQUEST_LATENCY.labels(blueprint, endpoint, method).observe(time.perf_counter() - start)
+        REQUEST_COUNT.labels(blueprint, endpoint, method, str(response.status_code)).inc()
+    return response
+
+
+def init_metrics(app):
+    """Record per-route latency and status counts for every request."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def render_metrics():
+    """Return (body, content_type) for the Prometheus text exposition format."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
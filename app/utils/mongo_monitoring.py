@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+from app.utils.metrics import MONGO_COMMAND_DURATION, MONGO_COMMAND_FAILURES
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool usage for this worker process: connections checked
+    out, checkout wait times, checkout failures and pool-clear events.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._pools = defaultdict(lambda: {
+                'open_connections': 0,
+                'checked_out': 0,
+                'max_checked_out': 0,
+                'checkouts': 0,
+                'checkout_failures': defaultdict(int),
+                'wait_ms_total': 0.0,
+                'wait_ms_max': 0.0,
+                'pool_cleared': 0
+            })
+
+    def _address(self, event):
+        host, port = event.address
+        return f'{host}:{port}'
+
+    # Pool lifecycle
+    def pool_created(self, event):
+        with self._lock:
+            self._pools[self._address(event)]
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pools[self._address(event)]['pool_cleared'] += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # Connection lifecycle
+    def connection_created(self, event):
+        with self._lock:
+            self._pools[self._address(event)]['open_connections'] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._pools[self._address(event)]['open_connections'] -= 1
+
+    # Checkout; started and completed events fire on the requesting thread
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        with self._lock:
+            self._pools[self._address(event)]['checkout_failures'][str(event.reason)] += 1
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        wait_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        with self._lock:
+            pool = self._pools[self._address(event)]
+            pool['checkouts'] += 1
+            pool['checked_out'] += 1
+            pool['max_checked_out'] = max(pool['max_checked_out'], pool['checked_out'])
+            pool['wait_ms_total'] += wait_ms
+            pool['wait_ms_max'] = max(pool['wait_ms_max'], wait_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._pools[self._address(event)]['checked_out'] -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable copy of the current pool metrics."""
+        with self._lock:
+            pools = {}
+            for address, pool in self._pools.items():
+                stats = dict(pool)
+                stats['checkout_failures'] = dict(pool['checkout_failures'])
+                stats['wait_ms_avg'] = round(pool['wait_ms_total'] / pool['checkouts'], 3) if pool['checkouts'] else 0.0
+                stats['wait_ms_total'] = round(pool['wait_ms_total'], 3)
+                stats['wait_ms_max'] = round(pool['wait_ms_max'], 3)
+                pools[address] = stats
+        return {'pid': os.getpid(), 'pools': pools}
+
+
+# Collections the app uses, labelled by name. Anything else is labelled 'other': in multiprocess
+# mode a series is never removed, so e.g. a label per full-refresh staging collection would pile up
+METRIC_COLLECTIONS = frozenset({
+    'employee', 'employee_column_mapping', 'ingest_slots', 'refresh_tokens', 'upload_sessions', 'users', 'worker'
+})
+
+
+def collection_label(name: str) -> str:
+    """Bounded `collection` label for a command target ('' for database-level commands)"""
+    if not name or name in METRIC_COLLECTIONS:
+        return name
+    if name.startswith('employee_staging_'):
+        return 'employee_staging'
+    return 'other'
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records MongoDB command durations by collection and command name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    def started(self, event):
+        # Only the started event carries the command document, which names the collection
+        target = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[event.request_id] = collection_label(target) if isinstance(target, str) else ''
+
+    def _pop_collection(self, event):
+        with self._lock:
+            return self._collections.pop(event.request_id, '')
+
+    def succeeded(self, event):
+        collection = self._pop_collection(event)
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._pop_collection(event)
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+pool_metrics = PoolMetricsListener()
+command_metrics = CommandMetricsListener()
+
+
+def build_client_options(config) -> Dict[str, Any]:
+    """Build MongoClient keyword arguments from the app config."""
+    options = {
+        'maxPoolSize': config.get('MONGO_MAX_POOL_SIZE'),
+        'minPoolSize': config.get('MONGO_MIN_POOL_SIZE'),
+        'waitQueueTimeoutMS': config.get('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        'serverSelectionTimeoutMS': config.get('MONGO_SERVER_SELECTION_TIMEOUT_MS'),
+        'connectTimeoutMS': config.get('MONGO_CONNECT_TIMEOUT_MS'),
+        'socketTimeoutMS': config.get('MONGO_SOCKET_TIMEOUT_MS'),
+        'compressors': config.get('MONGO_COMPRESSORS') or None,
+    }
+    options = {key: value for key, value in options.items() if value is not None}
+    options['event_listeners'] = [pool_metrics, command_metrics]
+    return options
@@ -0,0 +1,81 @@
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import uuid
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+logger = logging.getLogger(__name__)
+
+# Header only: a token in the query string would end up in access logs and browser history
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+def _profiling_requested():
+    expected = current_app.config.get('PROFILING_TOKEN')
+    if not expected:
+        return False
+    provided = request.headers.get(PROFILE_HEADER)
+    return bool(provided) and hmac.compare_digest(provided, expected)
+
+
+def _write_profile(profiler, endpoint):
+    """Dump cProfile stats plus a plain-text summary; returns the profile id."""
+    profile_dir = current_app.config['PROFILE_DIR']
+    os.makedirs(profile_dir, exist_ok=True)
+
+    profile_id = f"{endpoint.replace('.', '-')}-{uuid.uuid4().hex[:12]}"
+    profiler.dump_stats(os.path.join(profile_dir, f'{profile_id}.prof'))
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats('cumulative').print_stats(50)
+    with open(os.path.join(profile_dir, f'{profile_id}.txt'), 'w') as f:
+        f.write(f'{request.method} {request.full_path}\n')
+        f.write(summary.getvalue())
+
+    return profile_id
+
+
+def _profiled(endpoint, view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _profiling_requested():
+            return view(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        rv = profiler.runcall(view, *args, **kwargs)
+        response = make_response(rv)
+        try:
+            profile_id = _write_profile(profiler, endpoint)
+            response.headers[PROFILE_ID_HEADER] = profile_id
+            logger.info(f"Wrote request profile {profile_id} for {request.method} {request.path}")
+        except OSError as e:
+            logger.error(f"Error writing request profile: {str(e)}")
+        return response
+    return wrapper
+
+
+def init_profiling(app):
+    """
+    Wrap every registered view so admins can profile a single request by sending
+    the PROFILING_TOKEN in the X-Profile-Token header.
+
+    Must run after all blueprints are registered. Does nothing unless
+    PROFILING_ENABLED is set, so there is no per-request cost when it is off.
+    """
+    if not app.config.get('PROFILING_ENABLED'):
+        return
+    if not app.config.get('PROFILING_TOKEN'):
+        logger.warning("PROFILING_ENABLED is set but PROFILING_TOKEN is empty; profiling stays off")
+        return
+
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint == 'static':
+            continue
+        app.view_functions[endpoint] = _profiled(endpoint, view)
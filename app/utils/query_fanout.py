@@ -0,0 +1,71 @@
+"""
+Run independent MongoDB queries concurrently from a route.
+
+The MongoClient is thread-safe, so a route can hand its independent queries
+to a shared per-process thread pool and wait for all of them: latency
+becomes the slowest query rather than the sum of the round trips.
+
+Callables run on pool threads, outside the Flask request context and the
+request's StageTimer, so resolve collections and request arguments before
+submitting them. They must not fan out themselves, or a busy pool could
+deadlock waiting on its own threads.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when fanned-out queries do not all finish within the timeout."""
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    # Threads do not survive a fork, so a worker forked from a preloaded master builds its own pool
+    if _executor is None or _executor_pid != os.getpid():
+        with _lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.QUERY_FANOUT_WORKERS,
+                    thread_name_prefix='query-fanout'
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def run_concurrently(*calls: Callable[[], Any], timeout: Optional[float] = None) -> List[Any]:
+    """
+    Run zero-argument callables concurrently and return their results in order.
+
+    If one raises, its exception is re-raised once the others are cancelled or
+    finished. Queries still running after `timeout` seconds (default
+    QUERY_FANOUT_TIMEOUT_SECONDS) raise QueryTimeoutError; they cannot be
+    interrupted and finish in the background.
+    """
+    if len(calls) == 1:
+        return [calls[0]()]
+
+    timeout = Config.QUERY_FANOUT_TIMEOUT_SECONDS if timeout is None else timeout
+    futures = [_get_executor().submit(call) for call in calls]
+    done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+    for future in pending:
+        future.cancel()
+
+    # Surface a query error before a timeout caused by the others
+    for future in futures:
+        if future in done and future.exception() is not None:
+            raise future.exception()
+    if pending:
+        logger.warning(f"{len(pending)} of {len(futures)} concurrent queries did not finish within {timeout}s")
+        raise QueryTimeoutError(f"Queries did not finish within {timeout} seconds")
+    return [future.result() for future in futures]
@@ -0,0 +1,167 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Set
+
+from app.models.worker import parse_date
+from app.utils.leave_calendar import LeaveCalendar
+
+
+class ShiftDemandError(ValueError):
+    """Raised when a shift demand is malformed."""
+
+
+def parse_demands(raw_demands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate demand dicts ({date, skill, headcount, allow_probation}) and add ordinal days."""
+    demands = []
+    for position, raw in enumerate(raw_demands):
+        if not isinstance(raw, dict):
+            raise ShiftDemandError(f'demand {position} must be an object')
+        try:
+            day = parse_date(str(raw.get('date', '')))
+        except ValueError:
+            raise ShiftDemandError(f'demand {position}: date must be in dd/mm/YYYY format')
+        skill = str(raw.get('skill', '')).strip().lower()
+        if not skill:
+            raise ShiftDemandError(f'demand {position}: skill is required')
+        try:
+            headcount = int(raw.get('headcount', 1))
+        except (TypeError, ValueError):
+            raise ShiftDemandError(f'demand {position}: headcount must be an integer')
+        if headcount < 1:
+            raise ShiftDemandError(f'demand {position}: headcount must be at least 1')
+
+        demands.append({
+            'position': position,
+            'date': raw['date'],
+            'day': day,
+            'skill': skill,
+            'headcount': headcount,
+            'allow_probation': bool(raw.get('allow_probation', False))
+        })
+    return demands
+
+
+class ShiftScheduler:
+    """
+    Greedy shift assignment over a LeaveCalendar.
+
+    Skill -> worker pools are built once. Demands are filled most-constrained
+    first (fewest available candidates per requested head). Each skill pool is
+    walked round-robin from where the last demand stopped, so work spreads
+    across workers. A free count per (day, pool) stops the walk once the
+    demand can take no more heads, and skips it entirely for an exhausted
+    pool, so each demand costs O(headcount) amortised.
+    A worker gets at most one shift per day and is never assigned on leave.
+    """
+
+    def __init__(self, calendar: LeaveCalendar):
+        self.calendar = calendar
+        self._pools = defaultdict(list)
+        self._probation_pools = defaultdict(list)
+        self._skills = [worker.skills for worker in calendar.workers]
+        for index, worker in enumerate(calendar.workers):
+            for skill in self._skills[index]:
+                # Probation workers only join pools for demands that allow them
+                target = self._probation_pools if worker.probation else self._pools
+                target[skill].append(index)
+        self._combined_pools = {}
+        self._on_leave_by_day: Dict[int, Set[int]] = {}
+        self._leave_counts_by_day: Dict[int, Counter] = {}
+
+    def _on_leave(self, day: int) -> Set[int]:
+        if day not in self._on_leave_by_day:
+            self._on_leave_by_day[day] = self.calendar.on_leave_indexes(day)
+        return self._on_leave_by_day[day]
+
+    def _leave_counts(self, day: int) -> Counter:
+        """(skill, probation) -> number of workers on leave that day; the on-leave set is small."""
+        if day not in self._leave_counts_by_day:
+            counts = Counter()
+            for index in self._on_leave(day):
+                worker = self.calendar.workers[index]
+                for skill in worker.skills:
+                    counts[(skill, bool(worker.probation))] += 1
+            self._leave_counts_by_day[day] = counts
+        return self._leave_counts_by_day[day]
+
+    def _pool(self, demand) -> List[int]:
+        if not demand['allow_probation']:
+            return self._pools.get(demand['skill'], [])
+        skill = demand['skill']
+        if skill not in self._combined_pools:
+            self._combined_pools[skill] = self._pools.get(skill, []) + self._probation_pools.get(skill, [])
+        return self._combined_pools[skill]
+
+    def _available_count(self, demand) -> int:
+        counts = self._leave_counts(demand['day'])
+        on_leave = counts[(demand['skill'], False)]
+        if demand['allow_probation']:
+            on_leave += counts[(demand['skill'], True)]
+        return len(self._pool(demand)) - on_leave
+
+    def _mark_taken(self, taken: Counter, day: int, index: int):
+        # The worker leaves every pool it belongs to for that day, not just the one being filled
+        probation = self.calendar.workers[index].probation
+        for skill in self._skills[index]:
+            taken[(day, skill, True)] += 1
+            if not probation:
+                taken[(day, skill, False)] += 1
+
+    def assign(self, demands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fill parsed demands; returns per-demand assignments plus unfilled demand."""
+        order = sorted(demands, key=lambda d: (self._available_count(d) / d['headcount'], d['day']))
+
+        assigned_by_day = defaultdict(set)
+        cursors = defaultdict(int)
+        # (day, skill, allow_probation) -> workers of that pool already assigned that day, by any demand
+        taken = Counter()
+        results = [None] * len(demands)
+
+        for demand in order:
+            pool = self._pool(demand)
+            on_leave = self._on_leave(demand['day'])
+            busy = assigned_by_day[demand['day']]
+            cursor_key = (demand['skill'], demand['allow_probation'])
+
+            picked = []
+            free = self._available_count(demand) - taken[(demand['day'],) + cursor_key]
+            wanted = min(demand['headcount'], free)
+            start = cursors[cursor_key]
+            for step in range(len(pool) if wanted > 0 else 0):
+                if len(picked) == wanted:
+                    break
+                index = pool[(start + step) % len(pool)]
+                if index in on_leave or index in busy:
+                    continue
+                picked.append(index)
+                busy.add(index)
+                cursors[cursor_key] = (start + step + 1) % len(pool)
+                self._mark_taken(taken, demand['day'], index)
+
+            results[demand['position']] = {
+                'date': demand['date'],
+                'skill': demand['skill'],
+                'headcount': demand['headcount'],
+                'assigned': [
+                    {'_id': self.calendar.ids[index], 'name': self.calendar.workers[index].name}
+                    for index in picked
+                ],
+                'unfilled': demand['headcount'] - len(picked)
+            }
+
+        unfilled = [
+            {'position': position, 'date': result['date'], 'skill': result['skill'], 'unfilled': result['unfilled']}
+            for position, result in enumerate(results) if result['unfilled']
+        ]
+        requested = sum(d['headcount'] for d in demands)
+        filled = requested - sum(item['unfilled'] for item in unfilled)
+
+        return {
+            'assignments': results,
+            'unfilled': unfilled,
+            'summary': {
+                'demands': len(demands),
+                'requested': requested,
+                'filled': filled,
+                'unfilled': requested - filled
+            }
+        }
@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from flask import g
+
+_current_timer: ContextVar[Optional['StageTimer']] = ContextVar('stage_timer', default=None)
+
+# tracemalloc is process-wide: concurrent traced timers (gthread workers) would reset each
+# other's peaks and stop tracing under one another, so traced activations run one at a time
+_tracemalloc_lock = threading.Lock()
+
+# Characters outside an RFC 7230 token are not allowed in Server-Timing metric names
+_NON_TOKEN_CHARS = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]")
+
+
+class StageTimer:
+    """
+    Collects named, possibly nested, timing spans for one unit of work (e.g. an upload).
+
+    When `trace_memory` is set, each span also records how far traced memory
+    peaked above its level at the start of the span, using tracemalloc.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.spans: List[Dict[str, Any]] = []
+        self._stack: List[Dict[str, Any]] = []
+        self._started_tracing = False
+
+    @contextmanager
+    def activate(self):
+        """
+        Make this the timer used by the module-level `span()` helper.
+
+        With `trace_memory`, activations are serialized across threads for the
+        duration of the block, so memory-traced uploads run one at a time.
+        """
+        if self.trace_memory:
+            _tracemalloc_lock.acquire()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        token = _current_timer.set(self)
+        try:
+            yield self
+        finally:
+            _current_timer.reset(token)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            if self.trace_memory:
+                _tracemalloc_lock.release()
+
+    @contextmanager
+    def span(self, name: str):
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            self._record_peak_on_parent()
+            tracemalloc.reset_peak()
+
+        record = {'name': name, 'depth': len(self._stack), 'peak': 0}
+        self.spans.append(record)
+        self._stack.append(record)
+        memory_at_start = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            self._stack.pop()
+            if tracing:
+                record['peak'] = max(record['peak'], tracemalloc.get_traced_memory()[1])
+                # Peak allocation above what was already held when the span opened
+                record['peak_memory_kb'] = round((record['peak'] - memory_at_start) / 1024, 1)
+                self._record_peak_on_parent(record['peak'])
+            del record['peak']
+
+    def _record_peak_on_parent(self, peak: Optional[int] = None):
+        if not self._stack:
+            return
+        if peak is None:
+            peak = tracemalloc.get_traced_memory()[1]
+        parent = self._stack[-1]
+        parent['peak'] = max(parent['peak'], peak)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Spans in start order, with the total of the top-level spans."""
+        spans = [dict(s) for s in self.spans if 'duration_ms' in s]
+        return {
+            'total_ms': round(sum(s['duration_ms'] for s in spans if s['depth'] == 0), 3),
+            'stages': spans
+        }
+
+    def server_timing_header(self) -> str:
+        return ', '.join(
+            f"{_NON_TOKEN_CHARS.sub('_', s['name']) or '_'};dur={s['duration_ms']}"
+            for s in self.spans if 'duration_ms' in s
+        )
+
+
+@contextmanager
+def span(name: str):
+    """Time a block against the active StageTimer, or do nothing if there is none."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.span(name):
+        yield
+
+
+def start_request_timer(trace_memory: bool = False) -> StageTimer:
+    """Create a timer for the current request; its spans are returned in a Server-Timing header."""
+    g.stage_timer = StageTimer(trace_memory=trace_memory)
+    return g.stage_timer
+
+
+def _add_server_timing(response):
+    timer = g.get('stage_timer')
+    if timer is not None and timer.spans:
+        response.headers['Server-Timing'] = timer.server_timing_header()
+    return response
+
+
+def init_timing(app):
+    app.after_request(_add_server_timing)
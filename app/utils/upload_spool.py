@@ -0,0 +1,67 @@
+import hashlib
+import os
+import time
+
+# Bytes copied from the request stream per read
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class ChunkError(ValueError):
+    """Raised when a chunk is incomplete or does not match its checksum."""
+
+
+def write_chunk(path: str, offset: int, stream, length: int, expected_sha256: str) -> None:
+    """
+    Write `length` bytes from `stream` into the spool file at `offset`.
+
+    The file is truncated to `offset` first, so anything left by an
+    interrupted earlier attempt at this chunk is overwritten. The chunk is
+    hashed while it is copied; on a short read or checksum mismatch the file
+    is truncated back to `offset` and ChunkError is raised.
+    """
+    mode = 'r+b' if os.path.exists(path) else 'w+b'
+    with open(path, mode) as spool:
+        spool.seek(0, os.SEEK_END)
+        if spool.tell() < offset:
+            raise ChunkError('Spooled data is missing; restart the upload')
+        spool.truncate(offset)
+        spool.seek(offset)
+
+        digest = hashlib.sha256()
+        remaining = length
+        while remaining > 0:
+            block = stream.read(min(COPY_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            spool.write(block)
+            remaining -= len(block)
+
+        if remaining > 0 or digest.hexdigest() != expected_sha256.lower():
+            spool.truncate(offset)
+            raise ChunkError('Chunk is incomplete or its checksum does not match')
+
+        spool.flush()
+        os.fsync(spool.fileno())
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as spool:
+        for block in iter(lambda: spool.read(COPY_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def purge_stale_spool_files(directory: str, max_age_seconds: float) -> int:
+    """Delete spool files untouched for longer than their session can live; returns the count removed"""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.part') and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
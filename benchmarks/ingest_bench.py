@@ -0,0 +1,166 @@
+"""
+Microbenchmarks for the ingest and validation hot paths.
+
+Times ExcelModelFactory.from_excel_file, ExcelModelFactory._process_single_dataframe,
+DynamicExcelModel.to_dict, validate_data and validate_store_columns on synthetic
+workbooks (see synthetic.py), and writes the results as JSON so CI can compare runs.
+
+Usage:
+    python benchmarks/ingest_bench.py --output ingest.json
+    python benchmarks/ingest_bench.py --sizes 1000,10000,100000,1000000 --max-file-rows 100000
+    python benchmarks/ingest_bench.py --baseline ingest_baseline.json --max-regression 0.2
+
+validate_store_columns writes its mapping to MongoDB; it is benchmarked against
+mongomock (benchmarks/requirements.txt) and skipped when that is not installed.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+
+from synthetic import make_employee_frame, write_workbook  # noqa: E402
+
+
+def time_call(fn, repeat):
+    """Run fn `repeat` times and return the individual durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations, rows):
+    median = statistics.median(durations)
+    return {
+        'rows': rows,
+        'runs': len(durations),
+        'median_s': round(median, 6),
+        'min_s': round(min(durations), 6),
+        'rows_per_s': round(rows / median, 1) if median > 0 else None
+    }
+
+
+def _mongomock_db():
+    try:
+        import mongomock
+    except ImportError:
+        return None
+    return mongomock.MongoClient()['bench']
+
+
+def run(sizes, extra_columns, repeat, max_file_rows):
+    from app import create_app, mongo
+    from app.factory.dynamic_excel_factory import ExcelModelFactory
+    from app.routes.excel import validate_store_columns
+    from app.utils.validation_utils import COLUMN_VALIDATION_CONFIG, validate_data
+
+    app = create_app()
+    mock_db = _mongomock_db()
+    required_columns = [col['label'] for col in COLUMN_VALIDATION_CONFIG if col['required']]
+    results = {}
+
+    with app.app_context(), tempfile.TemporaryDirectory() as workdir:
+        if mock_db is not None:
+            mongo.db = mock_db
+
+        for rows in sizes:
+            print(f'-- {rows} rows', file=sys.stderr)
+            df = make_employee_frame(rows, extra_columns=extra_columns)
+
+            if rows <= max_file_rows:
+                path = write_workbook(df, os.path.join(workdir, f'employees_{rows}.xlsx'))
+                results[f'from_excel_file@{rows}'] = summarize(
+                    time_call(lambda: ExcelModelFactory.from_excel_file(path), repeat), rows)
+
+            results[f'process_single_dataframe@{rows}'] = summarize(
+                time_call(lambda: ExcelModelFactory._process_single_dataframe(df), repeat), rows)
+
+            models = ExcelModelFactory._process_single_dataframe(df)
+            results[f'to_dict@{rows}'] = summarize(
+                time_call(lambda: [model.to_dict() for model in models], repeat), rows)
+
+            records = [model.to_dict() for model in models]
+            results[f'validate_data@{rows}'] = summarize(
+                time_call(lambda: [validate_data(record, COLUMN_VALIDATION_CONFIG) for record in records], repeat), rows)
+
+            if mock_db is not None:
+                columns = models[0].get_columns()
+                results[f'validate_store_columns@{rows}'] = summarize(
+                    time_call(lambda: validate_store_columns(required_columns, columns), repeat), rows)
+
+    return {
+        'meta': {
+            'created_at': datetime.datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'sizes': sizes,
+            'extra_columns': extra_columns,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare(current, baseline, max_regression, min_duration):
+    """Return regression messages for benchmarks present in both runs."""
+    problems = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('median_s'):
+            continue
+        if max(result['median_s'], previous['median_s']) < min_duration:
+            continue  # too fast to compare reliably
+        change = (result['median_s'] - previous['median_s']) / previous['median_s']
+        if change > max_regression:
+            problems.append(f"{name}: {previous['median_s']}s -> {result['median_s']}s ({change:+.0%})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated row counts')
+    parser.add_argument('--extra-columns', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-file-rows', type=int, default=100000,
+                        help='Largest size to write as .xlsx for from_excel_file (writing workbooks is slow)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a previous results file')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed relative slowdown (0.2 = 20%%)')
+    parser.add_argument('--min-duration', type=float, default=0.01,
+                        help='Ignore benchmarks faster than this many seconds when comparing')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    report = run(sizes, args.extra_columns, args.repeat, args.max_file_rows)
+
+    for name, result in report['results'].items():
+        print(f"{name:<40} {result['median_s'] * 1000:>12.2f} ms  {result['rows_per_s'] or 0:>14,.0f} rows/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.max_regression, args.min_duration)
+        for problem in problems:
+            print(f'REGRESSION: {problem}', file=sys.stderr)
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""
+End-to-end HTTP load harness.
+
+Boots create_app() against an in-process MongoDB stand-in (mongomock) or a
+local mongod. It seeds employees, then drives a concurrent mixed workload
+through the WSGI app: list, get, search, create, update and upload. The
+result is a per-operation latency/throughput report as JSON, which can be
+diffed against a stored baseline.
+
+Usage:
+    python benchmarks/load_harness.py --employees 20000 --duration 30 --output load.json
+    python benchmarks/load_harness.py --mongo-uri mongodb://localhost:27017/genesis_loadtest --concurrency 8
+    python benchmarks/load_harness.py --baseline load_baseline.json --max-regression 0.25
+
+Requests run on threads inside one process, so the numbers measure the
+application's own cost per request (serialization, validation, pandas, driver
+overhead), not gunicorn or network behaviour. mongomock is not thread-safe and
+fails spuriously under concurrent requests, so against it the harness drives a
+single worker by default; use --mongo-uri to measure concurrency.
+
+Latency percentiles cover successful (2xx) responses only; rejections (e.g.
+429 from the ingest governor) and errors are reported per operation instead.
+A run where any operation's non-2xx rate exceeds --max-error-rate fails and is
+not written to --output, so a baseline can never be made of rejections.
+Uploads wait up to --ingest-queue-timeout seconds for an ingest slot rather
+than being rejected straight away.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import make_employee_frame  # noqa: E402
+
+DEFAULT_MIX = 'list=40,get=25,search=10,create=10,update=10,upload=5'
+ROLES = ['Kitchen Helper', 'Server', 'Supervisor', 'Manager', 'Technician']
+SEARCH_TERMS = ['john', 'tan', 'server', 'finance', 'example.com', 'mei']
+SEED_BATCH_SIZE = 5000
+# Default worker threads against a real mongod; mongomock runs one (see module docstring)
+MONGOD_CONCURRENCY = 8
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def build_app(mongo_uri, upload_dir, allow_drop):
+    from app import create_app, mongo
+    from app.config import Config
+
+    class LoadTestConfig(Config):
+        TESTING = True
+        RESOURCE_FOLDER = upload_dir
+
+    if mongo_uri:
+        LoadTestConfig.MONGO_URI = mongo_uri
+
+    app = create_app(LoadTestConfig)
+
+    if mongo_uri:
+        db_name = mongo.db.name
+        if not allow_drop and not db_name.endswith('_loadtest'):
+            raise SystemExit(f"Refusing to seed '{db_name}': use a database ending in _loadtest or pass --allow-drop")
+    else:
+        import mongomock
+        mongo.cx = mongomock.MongoClient()
+        mongo.db = mongo.cx['genesis_loadtest']
+
+    return app, mongo
+
+
+def seed(app, mongo, employees):
+    """Seed the employee collection with documents shaped like Excel ingest output."""
+    from app.factory.dynamic_excel_factory import ExcelModelFactory
+
+    with app.app_context():
+        mongo.db.employee.drop()
+        mongo.db.employee_column_mapping.drop()
+        ids = []
+        for offset in range(0, employees, SEED_BATCH_SIZE):
+            rows = min(SEED_BATCH_SIZE, employees - offset)
+            df = make_employee_frame(rows, mandatory_null_rate=0, seed=offset)
+            df['EMAIL_ADDRESS'] = [f'seed{offset + i}@example.com' for i in range(rows)]
+            documents = [model.to_dict() for model in ExcelModelFactory.from_dataframe(df)]
+            ids.extend(mongo.db.employee.insert_many(documents).inserted_ids)
+    return [str(_id) for _id in ids]
+
+
+def make_upload_payload(rows):
+    buffer = io.BytesIO()
+    make_employee_frame(rows, mandatory_null_rate=0, seed=424242).to_excel(buffer, index=False, engine='openpyxl')
+    return buffer.getvalue()
+
+
+class Workload:
+    """Issues one request of a named operation and returns its status code."""
+
+    def __init__(self, client, employee_ids, upload_payload, rng, worker_id):
+        self.client = client
+        self.employee_ids = employee_ids
+        self.upload_payload = upload_payload
+        self.rng = rng
+        self.worker_id = worker_id
+        self.created = 0
+        self.uploads = 0
+
+    def list(self):
+        page = self.rng.randint(1, max(1, len(self.employee_ids) // 20))
+        return self.client.get(f'/api/employee?page={page}&limit=20').status_code
+
+    def get(self):
+        return self.client.get(f'/api/employee/{self.rng.choice(self.employee_ids)}').status_code
+
+    def search(self):
+        return self.client.get(f'/api/employee/search?q={self.rng.choice(SEARCH_TERMS)}').status_code
+
+    def create(self):
+        self.created += 1
+        return self.client.post('/api/employee', json={
+            'NAME': 'LOAD TEST USER',
+            'EMAIL_ADDRESS': f'load{self.worker_id}-{self.created}-{self.rng.random():.12f}@example.com',
+            'ROLE': self.rng.choice(ROLES),
+            'DEPARTMENT': 'Finance',
+            'PHONE_NUMBER': str(self.rng.randint(80000000, 99999999)),
+            'IS_PART_TIME': 'No',
+            'END_OF_PROBATION': 'Yes'
+        }).status_code
+
+    def update(self):
+        employee_id = self.rng.choice(self.employee_ids)
+        return self.client.put(f'/api/employee/{employee_id}', json={
+            'ROLE': self.rng.choice(ROLES)
+        }).status_code
+
+    def upload(self):
+        self.uploads += 1
+        return self.client.post(
+            '/api/excel/upload',
+            data={'file': (io.BytesIO(self.upload_payload), f'load_test_{self.worker_id}_{self.uploads}.xlsx')},
+            content_type='multipart/form-data'
+        ).status_code
+
+
+def drive(app, employee_ids, upload_payload, mix, concurrency, duration, seed_value):
+    operations = list(mix.keys())
+    weights = list(mix.values())
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = random.Random(seed_value + worker_id)
+        workload = Workload(app.test_client(), employee_ids, upload_payload, rng, worker_id)
+        local_latencies = defaultdict(list)
+        local_statuses = defaultdict(lambda: defaultdict(int))
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            start = time.perf_counter()
+            status = getattr(workload, operation)()
+            if 200 <= status < 300:
+                local_latencies[operation].append((time.perf_counter() - start) * 1000)
+            local_statuses[operation][status] += 1
+        with lock:
+            for operation, values in local_latencies.items():
+                latencies[operation].extend(values)
+            for operation, counts in local_statuses.items():
+                for status, count in counts.items():
+                    statuses[operation][status] += count
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    def rounded(value):
+        return None if value is None else round(value, 3)
+
+    operations_report = {}
+    for operation, counts in statuses.items():
+        values = sorted(latencies[operation])
+        requests = sum(counts.values())
+        errors = requests - len(values)
+        operations_report[operation] = {
+            'requests': requests,
+            'ok': len(values),
+            'errors': errors,
+            'rejected': counts.get(429, 0),
+            'error_rate': round(errors / requests, 4),
+            'statuses': {str(status): count for status, count in sorted(counts.items())},
+            # Throughput and latency count successful responses only
+            'throughput_rps': round(len(values) / elapsed, 2),
+            'p50_ms': rounded(percentile(values, 50)),
+            'p90_ms': rounded(percentile(values, 90)),
+            'p99_ms': rounded(percentile(values, 99)),
+            'max_ms': rounded(values[-1] if values else None),
+            'mean_ms': rounded(sum(values) / len(values) if values else None)
+        }
+
+    total = sum(report['requests'] for report in operations_report.values())
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'total_requests': total,
+        'throughput_rps': round(total / elapsed, 2),
+        'operations': operations_report
+    }
+
+
+def check_error_rates(report, max_error_rate):
+    """Return messages for operations whose non-2xx rate is above `max_error_rate`."""
+    problems = []
+    for operation, result in sorted(report['operations'].items()):
+        if result['error_rate'] > max_error_rate:
+            problems.append(
+                f"{operation} error rate {result['error_rate']:.1%} > {max_error_rate:.1%} (statuses {result['statuses']})"
+            )
+    return problems
+
+
+def compare(current, baseline, max_regression):
+    """Return regression messages for p50/p99 latency and throughput."""
+    problems = []
+    for operation, result in current['operations'].items():
+        previous = baseline.get('operations', {}).get(operation)
+        if not previous:
+            continue
+        for key in ('p50_ms', 'p99_ms'):
+            if result[key] is None:
+                problems.append(f"{operation} {key}: no successful requests")
+            elif previous.get(key) and (result[key] - previous[key]) / previous[key] > max_regression:
+                problems.append(f"{operation} {key}: {previous[key]} -> {result[key]}")
+        if previous['throughput_rps'] and (previous['throughput_rps'] - result['throughput_rps']) / previous['throughput_rps'] > max_regression:
+            problems.append(f"{operation} throughput_rps: {previous['throughput_rps']} -> {result['throughput_rps']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mongo-uri', help='Use a real mongod (database name must end in _loadtest); default is mongomock')
+    parser.add_argument('--allow-drop', action='store_true', help='Allow seeding a database not ending in _loadtest')
+    parser.add_argument('--employees', type=int, default=5000, help='Employees to seed')
+    parser.add_argument('--upload-rows', type=int, default=200, help='Rows in the workbook used by upload requests')
+    parser.add_argument('--concurrency', type=int,
+                        help=f'Concurrent workers (default {MONGOD_CONCURRENCY} with --mongo-uri, 1 with mongomock)')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to drive load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Weighted operation mix')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the report to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a previous report')
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='Fail (and do not write --output) if any operation has more non-2xx responses than this')
+    parser.add_argument('--ingest-queue-timeout', type=float, default=60,
+                        help='Seconds an upload waits for an ingest slot before a 429')
+    args = parser.parse_args()
+
+    # Read by app.config when the app is first imported
+    os.environ.setdefault('INGEST_QUEUE_TIMEOUT_SECONDS', str(args.ingest_queue_timeout))
+
+    if args.concurrency is None:
+        args.concurrency = MONGOD_CONCURRENCY if args.mongo_uri else 1
+    elif args.concurrency > 1 and not args.mongo_uri:
+        print('Warning: mongomock is not thread-safe; concurrent runs report spurious 500s', file=sys.stderr)
+
+    mix = parse_mix(args.mix)
+    with tempfile.TemporaryDirectory() as upload_dir:
+        app, mongo = build_app(args.mongo_uri, upload_dir, args.allow_drop)
+        print(f'Seeding {args.employees} employees...', file=sys.stderr)
+        employee_ids = seed(app, mongo, args.employees)
+        upload_payload = make_upload_payload(args.upload_rows)
+
+        print(f'Driving {args.concurrency} workers for {args.duration}s: {args.mix}', file=sys.stderr)
+        result = drive(app, employee_ids, upload_payload, mix, args.concurrency, args.duration, args.seed)
+
+    report = {
+        'meta': {
+            'created_at': datetime.datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'backend': 'mongod' if args.mongo_uri else 'mongomock',
+            'employees': args.employees,
+            'upload_rows': args.upload_rows,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'mix': mix
+        },
+        **result
+    }
+
+    def ms(value):
+        return f"{value:>9.2f}" if value is not None else f"{'-':>9}"
+
+    print(f"{'operation':<10} {'requests':>9} {'errors':>7} {'429s':>6} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for operation, stats in sorted(report['operations'].items()):
+        print(f"{operation:<10} {stats['requests']:>9} {stats['errors']:>7} {stats['rejected']:>6} "
+              f"{stats['throughput_rps']:>9.1f} {ms(stats['p50_ms'])} {ms(stats['p99_ms'])} {ms(stats['max_ms'])}")
+        if stats['errors']:
+            print(f"{'':<10} statuses: {stats['statuses']}")
+    print(f"total: {report['total_requests']} requests, {report['throughput_rps']} req/s")
+
+    error_problems = check_error_rates(report, args.max_error_rate)
+    for problem in error_problems:
+        print(f'ERRORS: {problem}', file=sys.stderr)
+
+    if args.output:
+        if error_problems:
+            print(f'Not writing {args.output}: the run is dominated by rejected or failed requests', file=sys.stderr)
+        else:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    problems = list(error_problems)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for problem in regressions:
+            print(f'REGRESSION: {problem}', file=sys.stderr)
+        problems.extend(regressions)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
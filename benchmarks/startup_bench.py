@@ -0,0 +1,98 @@
+"""
+Worker startup benchmark.
+
+Boots the app the way a gunicorn worker does (`import wsgi`) in fresh
+interpreters and records wall time, peak RSS and whether the pandas/NumPy/
+openpyxl stack was imported. Exits non-zero when a regression is detected.
+
+Usage:
+    python benchmarks/startup_bench.py --runs 5 --output startup.json
+    python benchmarks/startup_bench.py --baseline startup_baseline.json --max-regression 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl')
+
+PROBE = f"""
+import json, resource, sys, time
+start = time.perf_counter()
+import wsgi
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'boot_ms': elapsed * 1000,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'heavy_modules_loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+}}))
+"""
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(runs):
+    samples = [run_once() for _ in range(runs)]
+    return {
+        'runs': runs,
+        'boot_ms_median': round(statistics.median(s['boot_ms'] for s in samples), 2),
+        'boot_ms_min': round(min(s['boot_ms'] for s in samples), 2),
+        'max_rss_kb_median': int(statistics.median(s['max_rss_kb'] for s in samples)),
+        'heavy_modules_loaded': sorted({m for s in samples for m in s['heavy_modules_loaded']})
+    }
+
+
+def compare(result, baseline, max_regression):
+    """Return a list of regression messages (empty when within budget)."""
+    problems = []
+    if result['heavy_modules_loaded']:
+        problems.append(f"heavy modules imported at boot: {', '.join(result['heavy_modules_loaded'])}")
+    for key in ('boot_ms_median', 'max_rss_kb_median'):
+        if key in baseline and baseline[key] > 0:
+            change = (result[key] - baseline[key]) / baseline[key]
+            if change > max_regression:
+                problems.append(f"{key} regressed {change:.0%} ({baseline[key]} -> {result[key]})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against a previous results file')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='Allowed relative slowdown (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    problems = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(result, json.load(f), args.max_regression)
+    elif result['heavy_modules_loaded']:
+        problems = compare(result, {}, args.max_regression)
+
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Synthetic employee workbooks for benchmarks.
+
+Produces frames shaped like the uploads we receive: the MANDATORY_COLUMNS as
+upper-case headers, a configurable number of extra columns of mixed types,
+and realistic gaps (a few nulls in mandatory columns, more in extra ones).
+"""
+import numpy as np
+import pandas as pd
+
+DEPARTMENTS = ['Food and Beverage', 'Housekeeping', 'Front Office', 'Engineering', 'Finance', 'Security']
+ROLES = ['Kitchen Helper', 'Server', 'Supervisor', 'Manager', 'Technician', 'Clerk', 'Guard']
+FIRST_NAMES = ['JOHN', 'JANE', 'WEI', 'SITI', 'RAJ', 'MARIA', 'AHMAD', 'MEI', 'DAVID', 'NUR']
+LAST_NAMES = ['DOE', 'TAN', 'LIM', 'KUMAR', 'ONG', 'LEE', 'WONG', 'ABDULLAH', 'NG', 'CHUA']
+
+
+def make_employee_frame(rows, extra_columns=5, mandatory_null_rate=0.005, extra_null_rate=0.2, seed=0):
+    """Build a DataFrame of `rows` synthetic employees with `extra_columns` non-mandatory columns."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows)
+
+    first = np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), rows)]
+    last = np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), rows)]
+    names = np.char.add(np.char.add(first, ' '), last)
+    emails = np.char.add(np.char.add(np.char.lower(first), ids.astype(str)), '@example.com')
+
+    data = {
+        'NAME': names.astype(object),
+        'PHONE_NUMBER': (80000000 + rng.integers(0, 19999999, rows)).astype('int64'),
+        'EMAIL_ADDRESS': emails.astype(object),
+        'DEPARTMENT': np.array(DEPARTMENTS, dtype=object)[rng.integers(0, len(DEPARTMENTS), rows)],
+        'ROLE': np.array(ROLES, dtype=object)[rng.integers(0, len(ROLES), rows)],
+        'END_OF_PROBATION': np.where(rng.random(rows) < 0.8, 'Yes', 'No').astype(object),
+        'IS_PART_TIME': np.where(rng.random(rows) < 0.3, 'Yes', 'No').astype(object),
+    }
+    df = pd.DataFrame(data)
+
+    # Sparse gaps in the mandatory text columns (never the key columns)
+    for column in ('DEPARTMENT', 'ROLE'):
+        df.loc[rng.random(rows) < mandatory_null_rate, column] = None
+
+    for i in range(extra_columns):
+        kind = i % 4
+        if kind == 0:
+            values = rng.normal(3500, 800, rows).round(2)
+        elif kind == 1:
+            values = rng.integers(18, 65, rows).astype(float)
+        elif kind == 2:
+            values = np.array(['A', 'B', 'C', 'D'], dtype=object)[rng.integers(0, 4, rows)]
+        else:
+            values = pd.date_range('2020-01-01', periods=rows, freq='h').strftime('%d/%m/%Y').to_numpy(dtype=object)
+        column = pd.Series(values)
+        column[rng.random(rows) < extra_null_rate] = None
+        df[f'Extra Field {i + 1}'] = column
+
+    return df
+
+
+def write_workbook(df, path):
+    """Write the frame as a single-sheet .xlsx file."""
+    df.to_excel(path, index=False, engine='openpyxl')
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write a synthetic employee workbook')
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--extra-columns', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_workbook(make_employee_frame(args.rows, args.extra_columns, seed=args.seed), args.path)
+    print(f'Wrote {args.rows} rows to {args.path}')
@@ -0,0 +1,88 @@
+"""
+Gunicorn settings for production: `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+Every setting can be overridden through the GUNICORN_* environment
+variables below (WEB_CONCURRENCY is honoured for the worker count).
+"""
+import glob
+import math
+import os
+
+
+def _cpu_count():
+    # Respect the CPUs the container is pinned to, not the host's
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_seconds(name, default):
+    # Parsed like Config does (a float), rounded up to whole seconds for gunicorn
+    value = os.environ.get(name)
+    return math.ceil(float(value)) if value else default
+
+
+# Metrics from every worker are aggregated through this directory (see app/utils/metrics.py).
+# It must be set before the app, and with it prometheus_client, is imported.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/genesis-metrics')
+_metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+if not os.environ.get('GUNICORN_METRICS_DIR_READY'):
+    # Clear samples from a previous run, but not on a config reload (SIGHUP) while workers are writing
+    os.makedirs(_metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(_metrics_dir, '*.db')):
+        os.remove(path)
+    os.environ['GUNICORN_METRICS_DIR_READY'] = '1'
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8080')
+
+# gthread keeps slow clients and SSE change-feed streams (at most EVENT_STREAM_MAX_CONCURRENT
+# per worker) from tying up a whole process;
+# set GUNICORN_WORKER_CLASS=sync for one request per process
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# pandas ingest is CPU-bound and holds the GIL, so parallelism comes from processes.
+# Each worker can hold a large workbook in memory, hence the cap.
+workers = _env_int('WEB_CONCURRENCY', min(2 * _cpu_count() + 1, _env_int('GUNICORN_MAX_WORKERS', 8)))
+threads = _env_int('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1)
+
+# Import the app once in the master; workers share its memory pages copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Recycle workers regularly: large uploads fragment the heap and it is never returned to the OS.
+# Jitter keeps the workers from all restarting at once.
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# A synchronous upload to /api/excel/upload parses and writes the whole workbook inside the
+# request, after waiting up to INGEST_QUEUE_TIMEOUT_SECONDS for an ingest slot.
+# This is gunicorn's worker heartbeat, not a per-request limit. Under `sync` the heartbeat stops
+# while a request runs, so it caps the slowest upload. Under `gthread` the main thread keeps
+# beating while requests run in the pool, so it only catches a wedged worker and a long upload
+# is not cut off here at all; bound it with the reverse proxy's read timeout instead.
+timeout = _env_int('GUNICORN_UPLOAD_TIMEOUT', 300) + _env_seconds('INGEST_QUEUE_TIMEOUT_SECONDS', 0)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # The preloaded app's MongoClient belongs to the master; each worker needs its own
+    if preload_app:
+        from app import reinit_after_fork
+
+        reinit_after_fork(server.app.wsgi())
+        server.log.info(f"Worker {worker.pid}: MongoDB client re-created after fork")
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from the aggregated metrics
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)